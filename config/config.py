@@ -22,7 +22,32 @@ logging.basicConfig(
 # Search Configuration
 RESULTS_PER_QUERY = 15  # Top 15-18 results per query
 SEARCH_DELAY = 1  # Delay between searches (seconds)
+SEARCH_BURST = 3  # Searches allowed back-to-back before SEARCH_DELAY spacing applies
 MAX_RETRIES = 3
+SEARCH_BACKOFF_BASE = 1.0  # First retry delay for failed searches (seconds)
+SEARCH_BACKOFF_MAX = 30  # Retry delay ceiling (seconds)
+SEARCH_BACKOFF_JITTER = 0.5  # Random extra fraction added to each retry delay
+SEARCH_CONCURRENCY = 5  # Max in-flight SerpAPI requests during a batch search
+SERPAPI_TIMEOUT = 30  # Total timeout per SerpAPI request (seconds)
+SEARCH_CACHE_SIZE = 1024  # SerpAPI responses kept in memory per search engine (LRU)
+SEARCH_CACHE_TTL = 86400  # Keep SerpAPI responses on disk for a day so reruns skip the API (seconds)
+SEMANTIC_CACHE_MODEL = 'all-MiniLM-L6-v2'  # Sentence-transformers model for paraphrase lookups (optional dependency)
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity above which a cached query's results are reused
+SEMANTIC_CACHE_SIZE = 10000  # Paraphrase cache entries kept, oldest evicted first
+ANALYSIS_CACHE_SIZE = 4096  # Analyzed organic results reused across queries (LRU)
+DOMAIN_WORKERS = 4  # Domains processed in parallel by 'Process All Domains'
+CRAWL_CONCURRENCY = 20  # Max in-flight HEAD probes when checking many URLs at once
+
+# LLM Configuration
+GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'gemini-1.5-flash')
+GEMINI_CONCURRENCY = 16  # Max in-flight Gemini requests per batch
+GEMINI_TIMEOUT = 30  # Per-request timeout for Gemini calls (seconds)
+GEMINI_BATCH_SIZE = 10  # Search results packed into one structured-analysis prompt
+GEMINI_RETRY_BASE_DELAY = 0.2  # First backoff delay for rate-limited/unavailable Gemini calls (seconds)
+GEMINI_RETRY_MAX_DELAY = 8  # Backoff ceiling (seconds)
+GEMINI_BREAKER_THRESHOLD = 10  # Consecutive failed Gemini calls before falling back to rule-based analysis
+GEMINI_BREAKER_COOLDOWN = 60  # How long to stay on the fallback path once tripped (seconds)
+LLM_CACHE_TTL = 7 * 86400  # Keep cached Gemini responses for a week (seconds)
 
 # Data Analysis Configuration
 RELEVANCE_THRESHOLD = 0.6  # Minimum relevance score to include result
@@ -34,8 +59,9 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')
 OUTPUT_DIR = os.path.join(DATA_DIR, 'output')
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
 
 # Create directories if they don't exist
-for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, OUTPUT_DIR, LOGS_DIR]:
+for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, OUTPUT_DIR, CACHE_DIR, LOGS_DIR]:
     os.makedirs(directory, exist_ok=True)
@@ -50,7 +50,6 @@ def check_dependencies():
         "beautifulsoup4", 
         "pandas",
         "openpyxl",
-        "google-search-results",  # serpapi package
         "python-dotenv"
     ]
     
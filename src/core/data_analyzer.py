@@ -7,7 +7,7 @@ import re
 import logging
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -32,7 +32,7 @@ class ExtractionMethod(Enum):
     REGISTRATION_REQUIRED = "Registration Required"
     NOT_ACCESSIBLE = "Not Accessible"
 
-@dataclass
+@dataclass(slots=True)
 class DataSourceAnalysis:
     """Analysis result for a data source"""
     url: str
@@ -51,6 +51,41 @@ class DataSourceAnalysis:
     data_freshness: str
     confidence_score: float
 
+@dataclass(slots=True)
+class QueryResult:
+    """Outcome of one search query, as returned by the search engines"""
+    query: str
+    target_domain: str
+    total_results: int = 0
+    unique_results: int = 0
+    analyzed_results: int = 0
+    relevant_results: int = 0
+    results: list = field(default_factory=list)
+    search_metadata: Dict = field(default_factory=dict)
+    status: str = "success"
+    error_message: Optional[str] = None
+    query_id: str = ""
+    prompt_template: str = ""
+    query_type: str = ""
+    
+    def to_dict(self) -> Dict:
+        """Field values keyed by field name, without the deep copy done by dataclasses.asdict"""
+        return {
+            'query': self.query,
+            'target_domain': self.target_domain,
+            'total_results': self.total_results,
+            'unique_results': self.unique_results,
+            'analyzed_results': self.analyzed_results,
+            'relevant_results': self.relevant_results,
+            'results': self.results,
+            'search_metadata': self.search_metadata,
+            'status': self.status,
+            'error_message': self.error_message,
+            'query_id': self.query_id,
+            'prompt_template': self.prompt_template,
+            'query_type': self.query_type
+        }
+
 class DataSourceAnalyzer:
     """Analyzes search results to understand data sources"""
     
@@ -113,6 +148,11 @@ class DataSourceAnalyzer:
             DocumentType.DIRECTORY: ["directory", "listing", "catalog"]
         }
     
+    @staticmethod
+    def can_analyze(result) -> bool:
+        """Whether a search result has the shape analyze_search_result needs (a dict with a link)"""
+        return isinstance(result, dict) and bool(result.get('link'))
+    
     def analyze_search_result(self, result: Dict, target_domain: str) -> DataSourceAnalysis:
         """Analyze a single search result"""
         url = result.get('link', '')
@@ -8,7 +8,7 @@ import logging
 from typing import List, Dict
 from datetime import datetime
 import os
-from src.core.data_analyzer import DataSourceAnalysis
+from src.core.data_analyzer import DataSourceAnalysis, QueryResult
 from config.config import OUTPUT_DIR
 
 logger = logging.getLogger(__name__)
@@ -20,7 +20,7 @@ class DirectoryCreator:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
     
-    def create_domain_directory(self, domain_name: str, search_results: List[Dict]) -> str:
+    def create_domain_directory(self, domain_name: str, search_results: List[QueryResult]) -> str:
         """Create Excel directory for a specific domain"""
         logger.info(f"Creating directory for domain: {domain_name}")
         
@@ -30,17 +30,17 @@ class DirectoryCreator:
         
         for query_result in search_results:
             query_summary = {
-                "Query ID": query_result.get("query_id", ""),
-                "Search Query": query_result.get("query", ""),
-                "Query Type": query_result.get("query_type", ""),
-                "Total Results": query_result.get("total_results", 0),
-                "Relevant Results": query_result.get("relevant_results", 0),
-                "Status": query_result.get("status", "success")
+                "Query ID": query_result.query_id,
+                "Search Query": query_result.query,
+                "Query Type": query_result.query_type,
+                "Total Results": query_result.total_results,
+                "Relevant Results": query_result.relevant_results,
+                "Status": query_result.status
             }
             summary_data.append(query_summary)
             
             # Process individual results
-            for result in query_result.get("results", []):
+            for result in query_result.results:
                 if isinstance(result, DataSourceAnalysis):
                     directory_entry = self._create_directory_entry(result, query_result)
                     directory_data.append(directory_entry)
@@ -70,10 +70,10 @@ class DirectoryCreator:
         logger.info(f"Directory created: {filepath}")
         return filepath
     
-    def _create_directory_entry(self, analysis: DataSourceAnalysis, query_result: Dict) -> Dict:
+    def _create_directory_entry(self, analysis: DataSourceAnalysis, query_result: QueryResult) -> Dict:
         """Create a directory entry from analysis result"""
         return {
-            "ID": f"{query_result.get('query_id', '')}_{hash(analysis.url) % 1000}",
+            "ID": f"{query_result.query_id}_{hash(analysis.url) % 1000}",
             "Title": analysis.title,
             "URL": analysis.url,
             "Domain": analysis.domain,
@@ -89,8 +89,8 @@ class DirectoryCreator:
             "Source Organization": analysis.source_organization,
             "Requires Payment": "Yes" if analysis.requires_payment else "No",
             "Data Freshness": analysis.data_freshness,
-            "Search Query": query_result.get("query", ""),
-            "Query Type": query_result.get("query_type", ""),
+            "Search Query": query_result.query,
+            "Query Type": query_result.query_type,
             "Date Analyzed": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Recommended Action": self._get_recommended_action(analysis),
             "Priority": self._get_priority(analysis),
@@ -240,7 +240,7 @@ class DirectoryCreator:
             adjusted_width = min(max_length + 2, 50)
             worksheet.column_dimensions[column_letter].width = adjusted_width
     
-    def create_master_directory(self, all_domain_results: Dict[str, List[Dict]]) -> str:
+    def create_master_directory(self, all_domain_results: Dict[str, List[QueryResult]]) -> str:
         """Create a master directory with all domains"""
         logger.info("Creating master directory with all domains")
         
@@ -253,7 +253,7 @@ class DirectoryCreator:
                 directory_data = []
                 
                 for query_result in search_results:
-                    for result in query_result.get("results", []):
+                    for result in query_result.results:
                         if isinstance(result, DataSourceAnalysis):
                             directory_entry = self._create_directory_entry(result, query_result)
                             directory_data.append(directory_entry)
@@ -5,6 +5,7 @@ Handles domain-specific search query generation and management with LLM enhancem
 
 import logging
 import re
+import sys
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import re
@@ -236,6 +237,7 @@ class DomainManager:
         """Add a custom domain dynamically"""
         if specific_terms is None:
             specific_terms = []
+        domain_key = sys.intern(domain_key)
         
         # Create a new Domain object
         custom_domain = Domain(
@@ -250,15 +252,13 @@ class DomainManager:
         
         # Add domain context for LLM if available
         if self.llm_analyzer and self.llm_analyzer.enabled:
-            # Add to domain contexts if it exists
-            if hasattr(self.llm_analyzer, 'domain_contexts'):
-                self.llm_analyzer.domain_contexts[domain_key] = {
-                    "industry": domain_name,
-                    "key_sectors": keywords,
-                    "associations": [],
-                    "data_types": ["Companies", "Organizations", "Directories", "Industry data"],
-                    "search_focus": f"{domain_name.lower()} companies India, {', '.join(keywords[:3])}"
-                }
+            self.llm_analyzer.add_domain_context(domain_key, {
+                "industry": domain_name,
+                "key_sectors": keywords,
+                "associations": [],
+                "data_types": ["Companies", "Organizations", "Directories", "Industry data"],
+                "search_focus": f"{domain_name.lower()} companies India, {', '.join(keywords[:3])}"
+            })
         
         logger.info(f"Added custom domain: {domain_name} with key: {domain_key}")
         return domain_key
@@ -295,14 +295,10 @@ class DomainManager:
                 Format as a numbered list with one query per line.
                 """
                 
-                if (hasattr(self.llm_analyzer, 'model') and 
-                    self.llm_analyzer.model and 
-                    hasattr(self.llm_analyzer.model, 'generate_content')):
-                    
-                    response = self.llm_analyzer.model.generate_content(prompt)
-                    if response and hasattr(response, 'text'):
-                        queries = self._parse_custom_llm_response(response.text, domain_name, temp_domain_key)
-                        return queries[:query_count]
+                response = self.llm_analyzer.model.generate_content(prompt)
+                if response.text:
+                    queries = self._parse_custom_llm_response(response.text, domain_name, temp_domain_key)
+                    return queries[:query_count]
                 
             except Exception as e:
                 logger.error(f"Custom LLM query generation failed: {e}")
@@ -4,15 +4,42 @@ Creates structured Excel files in the exact format requested by user
 """
 
 import pandas as pd
+import json
 import logging
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 import os
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 from src.core.gemini_analyzer import GeminiAnalyzer, StructuredDataPoint
+from src.core.data_analyzer import QueryResult
 from config.config import OUTPUT_DIR
 
 logger = logging.getLogger(__name__)
 
+# Column headers of the structured sheets, in StructuredDataPoint.to_tuple() order
+STRUCTURED_COLUMNS = (
+    'Industry', 'Sector', 'Document title', 'Data Link', 'Format', 'Action Required',
+    'Datapoints Contained', 'No. of Datapoints', 'Coverage', 'Source', 'Year', 'Additional comment'
+)
+
+# Column widths of the structured sheets, in STRUCTURED_COLUMNS order
+STRUCTURED_COLUMN_WIDTHS = {
+    'A': 20,  # Industry
+    'B': 25,  # Sector
+    'C': 40,  # Document title
+    'D': 50,  # Data Link
+    'E': 12,  # Format
+    'F': 20,  # Action Required
+    'G': 30,  # Datapoints Contained
+    'H': 18,  # No. of Datapoints
+    'I': 15,  # Coverage
+    'J': 20,  # Source
+    'K': 10,  # Year
+    'L': 40   # Additional comment
+}
+
 class EnhancedDirectoryCreator:
     """Creates Excel directories with LLM-enhanced structured analysis"""
     
@@ -32,63 +59,27 @@ class EnhancedDirectoryCreator:
             except Exception as e:
                 logger.error(f"Failed to initialize LLM: {e}")
     
-    def create_structured_directory(self, domain_name: str, search_results: List[Dict]) -> str:
-        """Create Excel directory in the exact user-specified format"""
+    def create_structured_directory(self, domain_name: str, search_results: List[QueryResult],
+                                    rows_path: Optional[str] = None) -> str:
+        """Create Excel directory in the exact user-specified format; rows are also written to rows_path as JSONL if given"""
         logger.info(f"Creating structured directory for domain: {domain_name}")
         
         # Process all search results into structured format
-        structured_data = []
-        
-        for query_result in search_results:
-            domain_key = self._get_domain_key(domain_name)
-            
-            for result in query_result.get("results", []):
-                try:
-                    # Use LLM analysis if available, otherwise fallback
-                    if self.llm_analyzer and self.llm_analyzer.enabled:
-                        structured_point = self.llm_analyzer.analyze_search_result_with_llm(
-                            {
-                                'title': result.title if hasattr(result, 'title') else str(result),
-                                'link': result.url if hasattr(result, 'url') else '',
-                                'snippet': result.data_description if hasattr(result, 'data_description') else ''
-                            },
-                            domain_key,
-                            result
-                        )
-                    else:
-                        # Fallback to standard conversion
-                        structured_point = self._convert_to_structured_format(result, domain_key)
-                    
-                    structured_data.append(structured_point)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing result: {e}")
-                    continue
+        domain_key = self._get_domain_key(domain_name)
+        results = [result for query_result in search_results for result in query_result.results]
+        structured_data = self._analyze_results(results, domain_key)
         
         # Create DataFrame in exact format requested
-        df_data = []
-        for point in structured_data:
-            df_data.append({
-                'Industry': point.industry,
-                'Sector': point.sector,
-                'Document title': point.document_title,
-                'Data Link': point.data_link,
-                'Format': point.format,
-                'Action Required': point.action_required,
-                'Datapoints Contained': point.datapoints_contained,
-                'No. of Datapoints': point.no_of_datapoints,
-                'Coverage': point.coverage,
-                'Source': point.source,
-                'Year': point.year,
-                'Additional comment': point.additional_comment
-            })
+        df_data = [point.to_tuple() for point in structured_data]
+        if rows_path:
+            self._write_rows(rows_path, df_data)
         
         # Create Excel file
         filename = f"{domain_name.replace(' ', '_')}_Structured_Directory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         filepath = os.path.join(self.output_dir, filename)
         
         if df_data:
-            df = pd.DataFrame(df_data)
+            df = pd.DataFrame(df_data, columns=STRUCTURED_COLUMNS)
             
             with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
                 # Main structured data sheet
@@ -108,6 +99,34 @@ class EnhancedDirectoryCreator:
         logger.info(f"Structured directory created: {filepath}")
         return filepath
     
+    def _analyze_results(self, results: List, domain_key: str) -> List[StructuredDataPoint]:
+        """Convert search results to structured data points, batching LLM calls when available"""
+        if self.llm_analyzer and self.llm_analyzer.enabled:
+            try:
+                return self.llm_analyzer.analyze_search_results_batch_sync(
+                    [self._to_llm_input(result) for result in results],
+                    domain_key
+                )
+            except Exception as e:
+                logger.error(f"Batch LLM analysis failed, using standard analysis: {e}")
+        
+        # Fallback to standard conversion
+        structured_data = []
+        for result in results:
+            try:
+                structured_data.append(self._convert_to_structured_format(result, domain_key))
+            except Exception as e:
+                logger.error(f"Error processing result: {e}")
+        return structured_data
+    
+    def _to_llm_input(self, result) -> Dict:
+        """Build the title/link/snippet dict the LLM analyzer expects"""
+        return {
+            'title': result.title if hasattr(result, 'title') else str(result),
+            'link': result.url if hasattr(result, 'url') else '',
+            'snippet': result.data_description if hasattr(result, 'data_description') else ''
+        }
+    
     def _get_domain_key(self, domain_name: str) -> str:
         """Convert domain name to key"""
         mapping = {
@@ -233,19 +252,19 @@ class EnhancedDirectoryCreator:
         
         return stats
     
-    def _create_query_metadata(self, search_results: List[Dict]) -> List[Dict]:
+    def _create_query_metadata(self, search_results: List[QueryResult]) -> List[Dict]:
         """Create query metadata information"""
         metadata = []
         
         for i, query_result in enumerate(search_results, 1):
             metadata.append({
                 "Query Number": i,
-                "Search Query": query_result.get("query", ""),
-                "Query Type": query_result.get("query_type", ""),
-                "Total Results": query_result.get("total_results", 0),
-                "Relevant Results": query_result.get("relevant_results", 0),
-                "Status": query_result.get("status", ""),
-                "Source": query_result.get("source", "standard")
+                "Search Query": query_result.query,
+                "Query Type": query_result.query_type,
+                "Total Results": query_result.total_results,
+                "Relevant Results": query_result.relevant_results,
+                "Status": query_result.status,
+                "Source": "standard"
             })
         
         return metadata
@@ -255,100 +274,66 @@ class EnhancedDirectoryCreator:
         workbook = writer.book
         worksheet = workbook[sheet_name]
         
-        # Define column widths for better readability
-        column_widths = {
-            'A': 20,  # Industry
-            'B': 25,  # Sector
-            'C': 40,  # Document title
-            'D': 50,  # Data Link
-            'E': 12,  # Format
-            'F': 20,  # Action Required
-            'G': 30,  # Datapoints Contained
-            'H': 18,  # No. of Datapoints
-            'I': 15,  # Coverage
-            'J': 20,  # Source
-            'K': 10,  # Year
-            'L': 40   # Additional comment
-        }
-        
-        # Set column widths
-        for col, width in column_widths.items():
+        # Set column widths for better readability
+        for col, width in STRUCTURED_COLUMN_WIDTHS.items():
             worksheet.column_dimensions[col].width = width
         
         # Style header row
         for cell in worksheet[1]:
             cell.font = cell.font.copy(bold=True)
     
-    def create_master_structured_directory(self, all_domain_results: Dict[str, List[Dict]]) -> str:
-        """Create master directory with all domains in structured format"""
+    def create_master_structured_directory(self, all_domain_rows: Dict[str, str]) -> str:
+        """Create master directory with all domains in structured format, streaming each domain's JSONL rows"""
         logger.info("Creating master structured directory with all domains")
         
         filename = f"Manufacturing_Master_Directory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         filepath = os.path.join(self.output_dir, filename)
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            all_data = []
-            
-            for domain_name, search_results in all_domain_results.items():
-                # Process each domain
-                domain_key = self._get_domain_key(domain_name)
-                
-                for query_result in search_results:
-                    for result in query_result.get("results", []):
-                        try:
-                            if self.llm_analyzer and self.llm_analyzer.enabled:
-                                structured_point = self.llm_analyzer.analyze_search_result_with_llm(
-                                    {
-                                        'title': result.title if hasattr(result, 'title') else str(result),
-                                        'link': result.url if hasattr(result, 'url') else '',
-                                        'snippet': result.data_description if hasattr(result, 'data_description') else ''
-                                    },
-                                    domain_key,
-                                    result
-                                )
-                            else:
-                                structured_point = self._convert_to_structured_format(result, domain_key)
-                            
-                            all_data.append({
-                                'Industry': structured_point.industry,
-                                'Sector': structured_point.sector,
-                                'Document title': structured_point.document_title,
-                                'Data Link': structured_point.data_link,
-                                'Format': structured_point.format,
-                                'Action Required': structured_point.action_required,
-                                'Datapoints Contained': structured_point.datapoints_contained,
-                                'No. of Datapoints': structured_point.no_of_datapoints,
-                                'Coverage': structured_point.coverage,
-                                'Source': structured_point.source,
-                                'Year': structured_point.year,
-                                'Additional comment': structured_point.additional_comment
-                            })
-                        except Exception as e:
-                            logger.error(f"Error processing result for master directory: {e}")
-            
-            # Create master sheet
-            if all_data:
-                df = pd.DataFrame(all_data)
-                df.to_excel(writer, sheet_name='All_Manufacturing_Data', index=False)
-                self._format_structured_sheet(writer, 'All_Manufacturing_Data')
-                
-                # Create domain-wise sheets
-                for domain_name in all_domain_results.keys():
-                    domain_data = df[df['Industry'] == self._get_domain_display_name(domain_name)]
-                    if not domain_data.empty:
-                        sheet_name = domain_name.replace(' ', '_').replace('&', 'and')[:31]
-                        domain_data.to_excel(writer, sheet_name=sheet_name, index=False)
-                        self._format_structured_sheet(writer, sheet_name)
+        # Write-only workbook: rows go straight to disk instead of being held in a DataFrame
+        workbook = Workbook(write_only=True)
+        master_sheet = self._new_structured_sheet(workbook, 'All_Manufacturing_Data')
+        
+        for domain_name, rows_path in all_domain_rows.items():
+            # Domain-wise sheets are created on the domain's first row, so empty domains get none
+            domain_sheet = None
+            for row in self._read_rows(rows_path):
+                if domain_sheet is None:
+                    sheet_name = domain_name.replace(' ', '_').replace('&', 'and')[:31]
+                    domain_sheet = self._new_structured_sheet(workbook, sheet_name)
+                master_sheet.append(row)
+                domain_sheet.append(row)
+        
+        workbook.save(filepath)
         
         logger.info(f"Master structured directory created: {filepath}")
         return filepath
     
-    def _get_domain_display_name(self, domain_key: str) -> str:
-        """Convert domain key to display name"""
-        mapping = {
-            "Chemical_Petrochemical": "Chemical & Petrochemical",
-            "Shipping": "Shipping & Logistics", 
-            "Sports_Equipment": "Sports Equipment Manufacturing",
-            "EdTech": "Educational Technology"
-        }
-        return mapping.get(domain_key, domain_key)
+    def _new_structured_sheet(self, workbook: Workbook, sheet_name: str):
+        """Add a write-only sheet with the structured columns' widths and a bold header row"""
+        worksheet = workbook.create_sheet(sheet_name)
+        for col, width in STRUCTURED_COLUMN_WIDTHS.items():
+            worksheet.column_dimensions[col].width = width
+        
+        header = []
+        for column in STRUCTURED_COLUMNS:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        worksheet.append(header)
+        return worksheet
+    
+    def _write_rows(self, rows_path: str, rows: List[Tuple]):
+        """Write structured rows to a JSONL file, one row per line"""
+        with open(rows_path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str))
+                f.write('\n')
+    
+    def _read_rows(self, rows_path: str) -> Iterator[List]:
+        """Yield structured rows back from a JSONL file written by _write_rows"""
+        if not os.path.exists(rows_path):
+            return
+        with open(rows_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -3,11 +3,11 @@ Free Search Engine for Manufacturing Data Collection
 Robust, simplified version focused on Google search with intelligent fallbacks
 """
 
+import threading
 import time
 import logging
 import requests
-import random
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import quote_plus
 
 # Free search imports with error handling
@@ -18,6 +18,8 @@ except ImportError:
     GOOGLE_SEARCH_AVAILABLE = False
     google_search = None
 
+from src.core.data_analyzer import QueryResult
+from src.core.rate_limiter import TokenBucket
 from config.config import SEARCH_DELAY, RESULTS_PER_QUERY
 
 logger = logging.getLogger(__name__)
@@ -28,7 +30,10 @@ class FreeSearchEngine:
     def __init__(self):
         """Initialize the free search engine"""
         self.search_count = 0
+        self._count_lock = threading.Lock()  # batch searches may run from several threads
         self.max_results = min(RESULTS_PER_QUERY, 10)  # Limit for free search
+        # Space out live Google requests to be respectful; fallback-only queries never wait
+        self._limiter = TokenBucket(1 / (SEARCH_DELAY + 1.5))
         
         # Set up requests session for fallback searches
         self.session = requests.Session()
@@ -41,7 +46,7 @@ class FreeSearchEngine:
         
         logger.info("Free Search Engine initialized successfully")
     
-    def search_query(self, query: str, target_domain: str, location: str = "India") -> Dict:
+    def search_query(self, query: str, target_domain: str, location: str = "India") -> QueryResult:
         """Execute a search query using available free methods"""
         logger.info(f"Searching: {query}")
         
@@ -50,6 +55,7 @@ class FreeSearchEngine:
         # Method 1: Google Search if available
         if GOOGLE_SEARCH_AVAILABLE and google_search is not None:
             try:
+                self._limiter.acquire()
                 google_results = self._search_google_simple(query, location)
                 all_results.extend(google_results)
                 logger.debug(f"Google search found {len(google_results)} results")
@@ -70,23 +76,22 @@ class FreeSearchEngine:
         filtered_results = self._filter_results(analyzed_results)
         
         # Create query result summary
-        query_result = {
-            "query": query,
-            "target_domain": target_domain,
-            "total_results": len(all_results),
-            "unique_results": len(unique_results),
-            "analyzed_results": len(analyzed_results),
-            "relevant_results": len(filtered_results),
-            "results": filtered_results,
-            "search_metadata": {
+        query_result = QueryResult(
+            query=query,
+            target_domain=target_domain,
+            total_results=len(all_results),
+            unique_results=len(unique_results),
+            analyzed_results=len(analyzed_results),
+            relevant_results=len(filtered_results),
+            results=filtered_results,
+            search_metadata={
                 "search_methods": ["google_free", "intelligent_fallback"],
                 "search_time": time.time()
             }
-        }
+        )
         
-        # Add delay between searches to be respectful
-        time.sleep(SEARCH_DELAY + random.uniform(1, 2))
-        self.search_count += 1
+        with self._count_lock:
+            self.search_count += 1
         
         return query_result
     
@@ -289,46 +294,22 @@ class FreeSearchEngine:
         
         return filtered_results[:self.max_results]
     
-    def _create_empty_result(self, query: str, target_domain: str) -> Dict:
+    def _create_empty_result(self, query: str, target_domain: str) -> QueryResult:
         """Create empty result structure"""
-        return {
-            "query": query,
-            "target_domain": target_domain,
-            "total_results": 0,
-            "unique_results": 0,
-            "analyzed_results": 0,
-            "relevant_results": 0,
-            "results": [],
-            "search_metadata": {
-                "search_methods": ["free_search"],
-                "search_time": time.time()
-            },
-            "status": "no_results"
-        }
+        return QueryResult(query=query, target_domain=target_domain, status="no_results",
+                           search_metadata={"search_methods": ["free_search"], "search_time": time.time()})
     
-    def _create_error_result(self, query: str, target_domain: str, error_msg: str) -> Dict:
+    def _create_error_result(self, query: str, target_domain: str, error_msg: str) -> QueryResult:
         """Create error result structure"""
-        return {
-            "query": query,
-            "target_domain": target_domain,
-            "total_results": 0,
-            "unique_results": 0,
-            "analyzed_results": 0,
-            "relevant_results": 0,
-            "results": [],
-            "search_metadata": {
-                "search_methods": ["free_search"],
-                "search_time": time.time()
-            },
-            "status": "error",
-            "error_message": error_msg
-        }
+        return QueryResult(query=query, target_domain=target_domain, status="error", error_message=error_msg,
+                           search_metadata={"search_methods": ["free_search"], "search_time": time.time()})
     
-    def batch_search(self, queries: List[Dict], target_domain: str) -> List[Dict]:
-        """Execute multiple search queries for a domain"""
+    def batch_search(self, queries: List[Dict], target_domain: str) -> Tuple[List[QueryResult], Dict]:
+        """Execute multiple search queries for a domain, returning the results and their running totals"""
         logger.info(f"🆓 Starting FREE batch search for {len(queries)} queries in domain: {target_domain}")
         
         results = []
+        stats = {"total_sources": 0, "successful_queries": 0, "error_queries": 0}
         for i, query_info in enumerate(queries, 1):
             logger.info(f"Processing query {i}/{len(queries)}")
             
@@ -337,23 +318,28 @@ class FreeSearchEngine:
                     query_info['search_query'], 
                     target_domain
                 )
-                result.update({
-                    "query_id": query_info['query_id'],
-                    "prompt_template": query_info.get('prompt_template', ''),
-                    "query_type": query_info['query_type']
-                })
-                results.append(result)
+                result.query_id = query_info['query_id']
+                result.prompt_template = query_info.get('prompt_template', '')
+                result.query_type = query_info['query_type']
                 
             except Exception as e:
                 logger.error(f"Failed to process query {i}: {e}")
-                results.append(self._create_error_result(
+                result = self._create_error_result(
                     query_info['search_query'], 
                     target_domain, 
                     str(e)
-                ))
+                )
+            results.append(result)
+            
+            # Running totals, so callers don't rescan the results for their summaries
+            stats["total_sources"] += len(result.results)
+            if result.status == 'error':
+                stats["error_queries"] += 1
+            else:
+                stats["successful_queries"] += 1
         
         logger.info(f"Completed FREE batch search. Processed {len(results)} queries.")
-        return results
+        return results, stats
     
     def get_search_stats(self) -> Dict:
         """Get search statistics"""
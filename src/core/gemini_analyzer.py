@@ -3,30 +3,297 @@ Gemini LLM Integration for Intelligent Manufacturing Data Analysis
 Provides context-aware analysis and structured output formatting
 """
 
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import os
 import re
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+import sys
+import threading
+import time
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-# Import Google Generative AI with comprehensive error handling
+# google.generativeai is imported lazily in GeminiAnalyzer.__init__; it is slow to import
+
+# Persistent response cache is optional; fall back to an in-process dict
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    diskcache = None
+
+# Structured responses are decoded with orjson when available (its errors subclass ValueError)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Multi-keyword matching uses an Aho-Corasick automaton when available
 try:
-    import google.generativeai as genai
-    GENAI_AVAILABLE = True
-    logger.info("Google Generative AI imported successfully")
-except ImportError as e:
-    logger.warning(f"Google Generative AI not available: {e}")
-    GENAI_AVAILABLE = False
-    genai = None
-except Exception as e:
-    logger.warning(f"Google Generative AI import issue: {e}")
-    GENAI_AVAILABLE = False
-    genai = None
-    
-from config.config import GEMINI_API_KEY
-
-@dataclass
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+    
+from config.config import (GEMINI_API_KEY, GEMINI_MODEL_NAME, GEMINI_CONCURRENCY, GEMINI_TIMEOUT, GEMINI_BATCH_SIZE,
+                           GEMINI_RETRY_BASE_DELAY, GEMINI_RETRY_MAX_DELAY, GEMINI_BREAKER_THRESHOLD,
+                           GEMINI_BREAKER_COOLDOWN, MAX_RETRIES, LLM_CACHE_TTL, CACHE_DIR)
+
+# Domain-specific context for intelligent analysis
+_DOMAIN_CONTEXTS = MappingProxyType({
+    "Chemical_Petrochemical": {
+        "industry": "Chemical & Petrochemical",
+        "key_sectors": ["Pharmaceuticals", "Specialty Chemicals", "Petrochemicals", "Fertilizers", "Paints & Coatings", "Polymers", "Agrochemicals"],
+        "associations": ["Indian Chemical Council (ICC)", "Pharmaceutical Export Promotion Council", "All India Plastic Manufacturers Association", "Federation of Indian Chambers of Commerce"],
+        "data_types": ["Manufacturing facilities", "Export-import data", "Company directories", "Trade associations", "Regulatory compliance"],
+        "search_focus": "chemical manufacturing companies, pharmaceutical exporters, petrochemical plants, chemical associations India, specialty chemicals directory"
+    },
+    "Shipping": {
+        "industry": "Shipping & Logistics",
+        "key_sectors": ["Maritime Transport", "Port Operations", "Freight Forwarding", "Container Shipping", "Warehousing", "Supply Chain"],
+        "associations": ["Indian National Shipowners Association (INSA)", "Container Shipping Lines Association", "Federation of Freight Forwarders Associations", "Shipping Corporation of India"],
+        "data_types": ["Shipping companies", "Port directories", "Logistics providers", "Freight forwarders", "Maritime services"],
+        "search_focus": "shipping companies India, maritime transport, port operators, logistics providers, freight forwarders directory"
+    },
+    "Sports_Equipment": {
+        "industry": "Sports Equipment Manufacturing",
+        "key_sectors": ["Cricket Equipment", "Football & Hockey Gear", "Fitness Equipment", "Outdoor Sports", "Athletic Wear", "Gymnasium Equipment"],
+        "associations": ["Sports Goods Export Promotion Council", "All India Sports Goods Manufacturers Federation", "Indian Olympic Association", "Sports Authority of India"],
+        "data_types": ["Sports equipment manufacturers", "Export data", "Sports associations", "Equipment suppliers", "Athletic gear companies"],
+        "search_focus": "sports equipment manufacturers India, sports goods exporters, athletic equipment suppliers, sports associations directory"
+    },
+    "EdTech": {
+        "industry": "Educational Technology",
+        "key_sectors": ["E-Learning Platforms", "Educational Software", "Digital Content", "Learning Management Systems", "Online Training", "Virtual Classrooms"],
+        "associations": ["Internet and Mobile Association of India", "Educational Technology Association", "National Association of Software and Services Companies", "Indian Chamber of Commerce"],
+        "data_types": ["EdTech companies", "Educational platforms", "Digital learning providers", "Training organizations", "Technology solutions"],
+        "search_focus": "edtech companies India, educational technology providers, e-learning platforms, digital education solutions, online training providers"
+    }
+})
+
+class DomainConstants(NamedTuple):
+    """Per-domain values read on every prompt build and analyzed result, resolved once per domain"""
+    industry: str
+    first_sector: str
+    sectors_csv: str
+
+def _domain_constants(domain_context: Dict) -> DomainConstants:
+    """Resolve the per-result constants of a domain context"""
+    key_sectors = domain_context.get('key_sectors') or ()
+    return DomainConstants(
+        industry=domain_context.get('industry', ''),
+        first_sector=key_sectors[0] if key_sectors else 'General',
+        sectors_csv=', '.join(key_sectors)
+    )
+
+# Industry types used to pick the query-generation prompt
+_MANUFACTURING_DOMAINS = frozenset({"Chemical_Petrochemical", "Sports_Equipment"})
+_SERVICE_DOMAINS = frozenset({"EdTech", "Shipping"})
+
+# Used for domains without a context; industry then falls back to the domain key
+_DEFAULT_DC = DomainConstants(industry='', first_sector='General', sectors_csv='')
+
+# Patterns to identify industry associations
+_ASSOCIATION_PATTERNS = MappingProxyType({
+    "association_keywords": [
+        "association", "federation", "council", "chamber", "society", "organization",
+        "board", "institute", "authority", "commission", "confederation"
+    ],
+    "company_keywords": [
+        "company", "corporation", "limited", "ltd", "private", "pvt", "industries",
+        "manufacturers", "enterprises", "group", "international"
+    ],
+    "directory_keywords": [
+        "directory", "list", "database", "registry", "catalog", "index", "listing"
+    ]
+})
+
+# Keywords used to estimate how many datapoints a source contains
+_HIGH_DATAPOINT_WORDS = ('comprehensive', 'complete', 'all')
+_MEDIUM_DATAPOINT_WORDS = ('directory', 'database')
+
+# Keyword -> categories it signals, scanned in a single pass over result text; only the
+# categories _classify_result reads, so the scan can stop as soon as both have been seen
+_KEYWORD_CATEGORIES = {}
+for _category, _keywords in (
+    ('datapoints_high', _HIGH_DATAPOINT_WORDS),
+    ('datapoints_med', _MEDIUM_DATAPOINT_WORDS),
+):
+    for _keyword in _keywords:
+        _KEYWORD_CATEGORIES.setdefault(_keyword, set()).add(_category)
+del _category, _keywords, _keyword
+
+# Patterns used when parsing Gemini responses
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_NUMBERED_RE = re.compile(r'^\d+\.\s*(.+)')
+_DIGITS_RE = re.compile(r'\d+')
+
+# Structured-output configs: Gemini answers with JSON matching these schemas
+_QUERY_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {"queries": {"type": "ARRAY", "items": {"type": "STRING"}}},
+        "required": ["queries"],
+    },
+}
+
+# JSON schema for batched structured analysis; one object per packed search result
+_ANALYSIS_ITEM_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "index": {"type": "INTEGER"},
+        "industry": {"type": "STRING"},
+        "sector": {"type": "STRING"},
+        "document_title": {"type": "STRING"},
+        "data_link": {"type": "STRING"},
+        "format": {"type": "STRING"},
+        "action_required": {"type": "STRING"},
+        "datapoints_contained": {"type": "STRING"},
+        "no_of_datapoints": {"type": "INTEGER"},
+        "coverage": {"type": "STRING"},
+        "source": {"type": "STRING"},
+        "year": {"type": "STRING"},
+        "additional_comment": {"type": "STRING"},
+    },
+    "required": ["index", "sector", "format", "action_required", "no_of_datapoints"],
+}
+_BATCH_ANALYSIS_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {"results": {"type": "ARRAY", "items": _ANALYSIS_ITEM_SCHEMA}},
+        "required": ["results"],
+    },
+}
+
+# For service industries like EdTech, focus on companies, platforms, providers
+_PROMPT_SERVICES = """
+Generate {query_count} specific search queries to find comprehensive data about the {industry} sector in India.
+
+Industry: {industry}
+Key Sectors: {sectors}
+
+Generate search queries that will find:
+1. Companies and service providers in this sector
+2. Industry associations and trade bodies
+3. Company directories with contact information  
+4. Government registrations and certifications
+5. Industry reports and market research
+6. Trade shows, conferences, and exhibitions
+7. Startup databases and investment information
+8. Professional networks and communities
+9. Regulatory bodies and compliance requirements
+10. Educational institutions and training providers
+
+Focus specifically on:
+- Service companies, platforms, and technology providers
+- Software and digital solution providers  
+- Consulting and professional services
+- Training and education providers
+- Industry networks and communities
+
+IMPORTANT:
+- Focus on INDIA market only
+- Do NOT use manufacturing terms like "manufacturers", "factories", "production"
+- Use appropriate terms like "companies", "providers", "platforms", "services"
+- Include specific Indian organizations and associations
+- Target specific data sources like directories, databases, reports
+
+Respond with JSON of the form {{"queries": ["search query text", ...]}}
+Make queries specific and actionable for finding business data.
+"""
+
+# For manufacturing industries, focus on manufacturers, exporters, suppliers
+_PROMPT_MANUFACTURING = """
+Generate {query_count} specific search queries to find comprehensive data about the {industry} manufacturing sector in India.
+
+Industry: {industry}
+Key Sectors: {sectors}
+
+Generate search queries that will find:
+1. Manufacturing companies and production facilities
+2. Export-import data and trade statistics
+3. Industry associations and trade bodies
+4. Company directories with contact information
+5. Government registrations and certifications
+6. Supplier and vendor databases
+7. Trade shows and exhibitions
+8. Quality certifications and standards
+9. Raw material suppliers and distributors
+10. Manufacturing clusters and industrial zones
+
+Focus specifically on:
+- Manufacturing companies and production units
+- Exporters and importers
+- Suppliers and distributors
+- Industrial associations and trade bodies
+- Government regulatory databases
+
+IMPORTANT:
+- Focus on INDIA market only
+- Use manufacturing-specific terms appropriately
+- Include specific Indian organizations and associations
+- Target specific data sources like directories, databases, reports
+
+Respond with JSON of the form {{"queries": ["search query text", ...]}}
+Make queries specific and actionable for finding business data.
+"""
+
+# General prompt for other industries
+_PROMPT_GENERAL = """
+Generate {query_count} specific search queries to find comprehensive business data about the {industry} sector in India.
+
+Industry: {industry}
+Key Sectors: {sectors}
+
+Generate search queries that will find:
+1. Companies and organizations in this sector
+2. Industry associations and trade bodies
+3. Company directories with contact information
+4. Government registrations and databases
+5. Industry reports and market research
+6. Trade shows and exhibitions
+7. Professional networks and communities
+8. Regulatory compliance requirements
+9. Investment and funding information
+10. Educational and training resources
+
+IMPORTANT:
+- Focus on INDIA market only
+- Use industry-appropriate terminology
+- Include specific Indian organizations
+- Target actionable data sources
+
+Respond with JSON of the form {{"queries": ["search query text", ...]}}
+"""
+
+_PROMPT_TEMPLATES = MappingProxyType({
+    "services": _PROMPT_SERVICES,
+    "manufacturing": _PROMPT_MANUFACTURING,
+    "general": _PROMPT_GENERAL,
+})
+
+@functools.lru_cache(maxsize=128)
+def _build_domain_prompt(industry_type: str, industry: str, sectors_csv: str, query_count: int) -> str:
+    """Fill the prompt template for an industry type; cached per argument tuple"""
+    template = _PROMPT_TEMPLATES.get(industry_type, _PROMPT_GENERAL)
+    return template.format_map({'industry': industry, 'sectors': sectors_csv, 'query_count': query_count})
+
+@dataclass(slots=True)
 class StructuredDataPoint:
     """Structured data point in the required format"""
     industry: str
@@ -41,6 +308,109 @@ class StructuredDataPoint:
     source: str
     year: str
     additional_comment: str
+    
+    def to_dict(self) -> Dict:
+        """Field values keyed by field name, without the deep copy done by dataclasses.asdict"""
+        return {
+            'industry': self.industry,
+            'sector': self.sector,
+            'document_title': self.document_title,
+            'data_link': self.data_link,
+            'format': self.format,
+            'action_required': self.action_required,
+            'datapoints_contained': self.datapoints_contained,
+            'no_of_datapoints': self.no_of_datapoints,
+            'coverage': self.coverage,
+            'source': self.source,
+            'year': self.year,
+            'additional_comment': self.additional_comment
+        }
+    
+    def to_tuple(self) -> Tuple:
+        """Field values in declaration order, for row-oriented export"""
+        return (
+            self.industry,
+            self.sector,
+            self.document_title,
+            self.data_link,
+            self.format,
+            self.action_required,
+            self.datapoints_contained,
+            self.no_of_datapoints,
+            self.coverage,
+            self.source,
+            self.year,
+            self.additional_comment
+        )
+
+def _build_keyword_matcher(keyword_categories: Dict[str, set]):
+    """Build a function returning the set of keyword categories found in a text"""
+    category_count = len(frozenset().union(*keyword_categories.values()))
+    
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword, categories in keyword_categories.items():
+            automaton.add_word(keyword, frozenset(categories))
+        automaton.make_automaton()
+        
+        def matches(text: str):
+            return (categories for _, categories in automaton.iter(text))
+    else:
+        # Lookahead alternation finds overlapping matches in one pass of the regex engine
+        alternation = '|'.join(re.escape(k) for k in sorted(keyword_categories, key=len, reverse=True))
+        pattern = re.compile(f'(?=({alternation}))')
+        
+        def matches(text: str):
+            return (keyword_categories[m.group(1)] for m in pattern.finditer(text))
+    
+    def match_keywords(text: str) -> set:
+        found = set()
+        for categories in matches(text):
+            found.update(categories)
+            if len(found) == category_count:
+                break
+        return found
+    
+    return match_keywords
+
+_match_keywords = _build_keyword_matcher(_KEYWORD_CATEGORIES)
+
+def _classify_result(link: str, title: str, snippet: str) -> Tuple[str, str, int, str]:
+    """Determine format, required action, estimated datapoints and source host for a search result"""
+    # Determine format from the URL path's extension, so '.pdf' in a query string does not count
+    parts = urlsplit(link)
+    host = parts.netloc.lower()
+    ext = os.path.splitext(parts.path)[1].lower()
+    if ext == '.pdf':
+        format_type = 'PDF'
+        action = 'PDF Download'
+    elif ext in ('.xlsx', '.xls'):
+        format_type = 'Excel'
+        action = 'PDF Download'
+    elif parts.path.startswith('/api') or 'api.' in host:
+        format_type = 'API'
+        action = 'API Integration'
+    else:
+        format_type = 'Website'
+        action = 'Website Crawling'
+    
+    # Estimate datapoints
+    categories = _match_keywords((title + snippet).lower())
+    
+    datapoints = 100  # Default
+    if 'datapoints_high' in categories:
+        datapoints = 1000
+    elif 'datapoints_med' in categories:
+        datapoints = 500
+    
+    return format_type, action, datapoints, host or 'Unknown'
+
+def classify_batch(results: List[Dict]) -> List[Tuple[str, str, int, str]]:
+    """Classify a batch of search results in a single pass"""
+    return [
+        _classify_result(result.get('link', ''), result.get('title', ''), result.get('snippet', ''))
+        for result in results
+    ]
 
 class GeminiAnalyzer:
     """Gemini-powered intelligent data analysis"""
@@ -50,284 +420,154 @@ class GeminiAnalyzer:
         self.api_key = api_key or GEMINI_API_KEY
         self.enabled = False
         self.model = None
+        self.response_cache = None
+        
+        # Transient API errors are retried with backoff; persistent failures trip a circuit
+        # breaker that routes callers to the rule-based path for GEMINI_BREAKER_COOLDOWN seconds
+        self._retryable_errors = (asyncio.TimeoutError, TimeoutError)
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+        self._breaker_lock = threading.Lock()  # domains may be analyzed from several threads
+        
+        # The async Gemini client binds its gRPC channel to the first event loop that uses it, so
+        # the sync wrappers share one long-lived loop on a background thread instead of asyncio.run
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        
+        # Domain-specific context (initialize regardless of LLM status); copied so
+        # custom domains can be added per instance without touching the shared constant
+        self.domain_contexts = dict(_DOMAIN_CONTEXTS)
+        self._domain_const = {key: _domain_constants(context) for key, context in self.domain_contexts.items()}
+        self.association_patterns = _ASSOCIATION_PATTERNS
         
-        if not GENAI_AVAILABLE:
-            logger.warning("Google Generative AI not available. Install with: pip install google-generativeai")
-            return
-            
         if not self.api_key:
             logger.warning("Gemini API key not provided. LLM features will be disabled.")
             return
         
+        # Only pay for the import when the analyzer can actually be used
         try:
-            # Try to configure and initialize Gemini with dynamic attribute access
-            if genai:
-                # Use getattr for safer access to methods that may not exist
-                configure_func = getattr(genai, 'configure', None)
-                if configure_func:
-                    configure_func(api_key=self.api_key)
-                    
-                model_class = getattr(genai, 'GenerativeModel', None)
-                if model_class:
-                    # Try different model names based on API version
-                    model_names = ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro', 'models/gemini-pro']
-                    
-                    for model_name in model_names:
-                        try:
-                            self.model = model_class(model_name)
-                            self.enabled = True
-                            logger.info(f"Gemini LLM initialized successfully with model: {model_name}")
-                            break
-                        except Exception as model_error:
-                            logger.debug(f"Failed to initialize model {model_name}: {model_error}")
-                            continue
-                    
-                    if not self.enabled:
-                        logger.warning("Could not initialize any Gemini model")
-                        self.enabled = False
-                else:
-                    logger.warning("GenerativeModel class not available")
-                    self.enabled = False
-            else:
-                logger.warning("genai module not available")
-                self.enabled = False
+            import google.generativeai as genai
+        except ImportError as e:
+            logger.warning(f"Google Generative AI not available ({e}). Install with: pip install google-generativeai")
+            return
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini: {e}")
-            self.enabled = False
+            logger.warning(f"Google Generative AI import issue: {e}")
+            return
         
-        # Domain-specific context (initialize regardless of LLM status)
-        self.domain_contexts = self._get_domain_contexts()
-        self.association_patterns = self._get_association_patterns()
+        try:
+            from google.api_core import exceptions as api_exceptions
+            self._retryable_errors += (
+                api_exceptions.ResourceExhausted,
+                api_exceptions.ServiceUnavailable,
+                api_exceptions.DeadlineExceeded,
+            )
+        except ImportError:
+            pass
         
-    def _get_domain_contexts(self) -> Dict[str, Dict]:
-        """Get comprehensive domain context for intelligent analysis"""
-        return {
-            "Chemical_Petrochemical": {
-                "industry": "Chemical & Petrochemical",
-                "key_sectors": ["Pharmaceuticals", "Specialty Chemicals", "Petrochemicals", "Fertilizers", "Paints & Coatings", "Polymers", "Agrochemicals"],
-                "associations": ["Indian Chemical Council (ICC)", "Pharmaceutical Export Promotion Council", "All India Plastic Manufacturers Association", "Federation of Indian Chambers of Commerce"],
-                "data_types": ["Manufacturing facilities", "Export-import data", "Company directories", "Trade associations", "Regulatory compliance"],
-                "search_focus": "chemical manufacturing companies, pharmaceutical exporters, petrochemical plants, chemical associations India, specialty chemicals directory"
-            },
-            "Shipping": {
-                "industry": "Shipping & Logistics",
-                "key_sectors": ["Maritime Transport", "Port Operations", "Freight Forwarding", "Container Shipping", "Warehousing", "Supply Chain"],
-                "associations": ["Indian National Shipowners Association (INSA)", "Container Shipping Lines Association", "Federation of Freight Forwarders Associations", "Shipping Corporation of India"],
-                "data_types": ["Shipping companies", "Port directories", "Logistics providers", "Freight forwarders", "Maritime services"],
-                "search_focus": "shipping companies India, maritime transport, port operators, logistics providers, freight forwarders directory"
-            },
-            "Sports_Equipment": {
-                "industry": "Sports Equipment Manufacturing",
-                "key_sectors": ["Cricket Equipment", "Football & Hockey Gear", "Fitness Equipment", "Outdoor Sports", "Athletic Wear", "Gymnasium Equipment"],
-                "associations": ["Sports Goods Export Promotion Council", "All India Sports Goods Manufacturers Federation", "Indian Olympic Association", "Sports Authority of India"],
-                "data_types": ["Sports equipment manufacturers", "Export data", "Sports associations", "Equipment suppliers", "Athletic gear companies"],
-                "search_focus": "sports equipment manufacturers India, sports goods exporters, athletic equipment suppliers, sports associations directory"
-            },
-            "EdTech": {
-                "industry": "Educational Technology",
-                "key_sectors": ["E-Learning Platforms", "Educational Software", "Digital Content", "Learning Management Systems", "Online Training", "Virtual Classrooms"],
-                "associations": ["Internet and Mobile Association of India", "Educational Technology Association", "National Association of Software and Services Companies", "Indian Chamber of Commerce"],
-                "data_types": ["EdTech companies", "Educational platforms", "Digital learning providers", "Training organizations", "Technology solutions"],
-                "search_focus": "edtech companies India, educational technology providers, e-learning platforms, digital education solutions, online training providers"
-            }
-        }
+        try:
+            genai.configure(api_key=self.api_key)
+            self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+            self.enabled = True
+            self.response_cache = self._open_response_cache()
+            logger.info(f"Gemini LLM initialized successfully with model: {GEMINI_MODEL_NAME}")
+        except Exception as e:
+            logger.error(f"Failed to initialize Gemini model {GEMINI_MODEL_NAME}: {e}")
+            self.model = None
+            self.enabled = False
     
-    def _get_association_patterns(self) -> Dict[str, List[str]]:
-        """Patterns to identify industry associations"""
-        return {
-            "association_keywords": [
-                "association", "federation", "council", "chamber", "society", "organization",
-                "board", "institute", "authority", "commission", "confederation"
-            ],
-            "company_keywords": [
-                "company", "corporation", "limited", "ltd", "private", "pvt", "industries",
-                "manufacturers", "enterprises", "group", "international"
-            ],
-            "directory_keywords": [
-                "directory", "list", "database", "registry", "catalog", "index", "listing"
-            ]
-        }
+    def add_domain_context(self, domain_key: str, domain_context: Dict):
+        """Register (or replace) the LLM context of a domain"""
+        # Interned like the built-in keys, so lookups with the same key hit the identity fast path
+        domain_key = sys.intern(domain_key)
+        self.domain_contexts[domain_key] = domain_context
+        self._domain_const[domain_key] = _domain_constants(domain_context)
     
     def generate_smart_queries(self, domain_key: str, query_count: int = 20) -> List[Dict]:
         """Generate intelligent, domain-specific search queries using Gemini"""
-        if not self.enabled:
+        if not self._llm_ready():
             logger.warning("Gemini not available, using basic query generation")
             return self._fallback_query_generation(domain_key, query_count)
         
         try:
-            domain_context = self.domain_contexts.get(domain_key, {})
             industry_type = self._get_industry_type(domain_key)
             
             # Create smart, domain-aware prompt for Gemini
-            prompt = self._create_domain_specific_prompt(domain_context, industry_type, query_count)
+            prompt = self._create_domain_specific_prompt(domain_key, industry_type, query_count)
             
-            if self.model and hasattr(self.model, 'generate_content'):
-                try:
-                    response = self.model.generate_content(prompt)
-                    if response and hasattr(response, 'text'):
-                        enhanced_queries = self._parse_gemini_queries(response.text, domain_key, query_count)
-                        logger.info(f"Generated {len(enhanced_queries)} enhanced queries for {domain_key}")
-                        return enhanced_queries
-                    else:
-                        logger.warning("Invalid response from Gemini model")
-                        return self._fallback_query_generation(domain_key, query_count)
-                except Exception as e:
-                    logger.error(f"Error generating content with Gemini: {e}")
-                    return self._fallback_query_generation(domain_key, query_count)
+            response_text = self._cached_generate(prompt, _QUERY_GENERATION_CONFIG)
+            if response_text:
+                enhanced_queries = self._parse_gemini_queries(response_text, domain_key, query_count)
+                logger.info(f"Generated {len(enhanced_queries)} enhanced queries for {domain_key}")
+                return enhanced_queries
             else:
-                logger.warning("Model not available for content generation")
+                logger.warning("Invalid response from Gemini model")
                 return self._fallback_query_generation(domain_key, query_count)
             
         except Exception as e:
             logger.error(f"Gemini query generation failed: {e}")
             return self._fallback_query_generation(domain_key, query_count)
     
+    async def generate_smart_queries_batch(self, domain_keys: List[str], query_count: int = 20,
+                                           concurrency: int = GEMINI_CONCURRENCY) -> Dict[str, List[Dict]]:
+        """Generate smart queries for several domains concurrently"""
+        if not self._llm_ready():
+            return {key: self._fallback_query_generation(key, query_count) for key in domain_keys}
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def generate(domain_key: str) -> List[Dict]:
+            try:
+                prompt = self._create_domain_specific_prompt(
+                    domain_key, self._get_industry_type(domain_key), query_count
+                )
+                async with semaphore:
+                    response_text = await self._acached_generate(prompt, _QUERY_GENERATION_CONFIG)
+                if response_text:
+                    return self._parse_gemini_queries(response_text, domain_key, query_count)
+                logger.warning("Invalid response from Gemini model")
+            except Exception as e:
+                logger.error(f"Gemini query generation failed for {domain_key}: {e}")
+            return self._fallback_query_generation(domain_key, query_count)
+        
+        queries = await asyncio.gather(*[generate(key) for key in domain_keys])
+        return dict(zip(domain_keys, queries))
+    
+    def generate_smart_queries_batch_sync(self, domain_keys: List[str], query_count: int = 20,
+                                          concurrency: int = GEMINI_CONCURRENCY) -> Dict[str, List[Dict]]:
+        """Synchronous wrapper around generate_smart_queries_batch"""
+        return self._run_on_loop(self.generate_smart_queries_batch(domain_keys, query_count, concurrency))
+    
     def _get_industry_type(self, domain_key: str) -> str:
         """Determine the industry type for appropriate query generation"""
-        manufacturing_domains = ["Chemical_Petrochemical", "Sports_Equipment"]
-        service_domains = ["EdTech", "Shipping"]
-        
-        if domain_key in manufacturing_domains:
+        if domain_key in _MANUFACTURING_DOMAINS:
             return "manufacturing"
-        elif domain_key in service_domains:
+        elif domain_key in _SERVICE_DOMAINS:
             return "services"
         else:
             return "general"
     
-    def _create_domain_specific_prompt(self, domain_context: Dict, industry_type: str, query_count: int) -> str:
+    def _create_domain_specific_prompt(self, domain_key: str, industry_type: str, query_count: int) -> str:
         """Create domain-specific prompts based on industry type"""
-        
-        industry = domain_context.get('industry', 'Unknown')
-        sectors = ', '.join(domain_context.get('key_sectors', []))
-        
-        if industry_type == "services":
-            # For service industries like EdTech, focus on companies, platforms, providers
-            prompt = f"""
-            Generate {query_count} specific search queries to find comprehensive data about the {industry} sector in India.
-
-            Industry: {industry}
-            Key Sectors: {sectors}
-
-            Generate search queries that will find:
-            1. Companies and service providers in this sector
-            2. Industry associations and trade bodies
-            3. Company directories with contact information  
-            4. Government registrations and certifications
-            5. Industry reports and market research
-            6. Trade shows, conferences, and exhibitions
-            7. Startup databases and investment information
-            8. Professional networks and communities
-            9. Regulatory bodies and compliance requirements
-            10. Educational institutions and training providers
-
-            Focus specifically on:
-            - Service companies, platforms, and technology providers
-            - Software and digital solution providers  
-            - Consulting and professional services
-            - Training and education providers
-            - Industry networks and communities
-
-            IMPORTANT:
-            - Focus on INDIA market only
-            - Do NOT use manufacturing terms like "manufacturers", "factories", "production"
-            - Use appropriate terms like "companies", "providers", "platforms", "services"
-            - Include specific Indian organizations and associations
-            - Target specific data sources like directories, databases, reports
-
-            Format each query as: "search query text"
-            Make queries specific and actionable for finding business data.
-            """
-            
-        elif industry_type == "manufacturing":
-            # For manufacturing industries, focus on manufacturers, exporters, suppliers
-            prompt = f"""
-            Generate {query_count} specific search queries to find comprehensive data about the {industry} manufacturing sector in India.
-
-            Industry: {industry}
-            Key Sectors: {sectors}
-
-            Generate search queries that will find:
-            1. Manufacturing companies and production facilities
-            2. Export-import data and trade statistics
-            3. Industry associations and trade bodies
-            4. Company directories with contact information
-            5. Government registrations and certifications
-            6. Supplier and vendor databases
-            7. Trade shows and exhibitions
-            8. Quality certifications and standards
-            9. Raw material suppliers and distributors
-            10. Manufacturing clusters and industrial zones
-
-            Focus specifically on:
-            - Manufacturing companies and production units
-            - Exporters and importers
-            - Suppliers and distributors
-            - Industrial associations and trade bodies
-            - Government regulatory databases
-
-            IMPORTANT:
-            - Focus on INDIA market only
-            - Use manufacturing-specific terms appropriately
-            - Include specific Indian organizations and associations
-            - Target specific data sources like directories, databases, reports
-
-            Format each query as: "search query text"
-            Make queries specific and actionable for finding business data.
-            """
-        else:
-            # General prompt for other industries
-            prompt = f"""
-            Generate {query_count} specific search queries to find comprehensive business data about the {industry} sector in India.
-
-            Industry: {industry}
-            Key Sectors: {sectors}
-
-            Generate search queries that will find:
-            1. Companies and organizations in this sector
-            2. Industry associations and trade bodies
-            3. Company directories with contact information
-            4. Government registrations and databases
-            5. Industry reports and market research
-            6. Trade shows and exhibitions
-            7. Professional networks and communities
-            8. Regulatory compliance requirements
-            9. Investment and funding information
-            10. Educational and training resources
-
-            IMPORTANT:
-            - Focus on INDIA market only
-            - Use industry-appropriate terminology
-            - Include specific Indian organizations
-            - Target actionable data sources
-
-            Format each query as: "search query text"
-            """
-        
-        return prompt
+        dc = self._domain_const.get(domain_key, _DEFAULT_DC)
+        return _build_domain_prompt(industry_type, dc.industry or 'Unknown', dc.sectors_csv, query_count)
     
     def _parse_gemini_queries(self, response_text: str, domain_key: str, max_queries: int = 20) -> List[Dict]:
         """Parse Gemini response to extract queries"""
-        queries = []
-        lines = response_text.split('\n')
+        try:
+            candidates = _json_loads(response_text).get('queries', [])
+        except (ValueError, AttributeError):
+            # Not structured output; extract queries from quotes or numbered lists
+            candidates = []
+            for line in response_text.splitlines():
+                match = _QUOTED_RE.search(line) or _NUMBERED_RE.match(line)
+                if match:
+                    candidates.append(match.group(1))
         
-        for i, line in enumerate(lines):
+        queries = []
+        for query in candidates:
             if len(queries) >= max_queries:
                 break
-                
-            # Extract queries from quotes or numbered lists
-            query_match = re.search(r'"([^"]+)"', line)
-            if query_match:
-                query = query_match.group(1)
-            elif re.match(r'^\d+\.\s*(.+)', line):
-                match = re.match(r'^\d+\.\s*(.+)', line)
-                if match:
-                    query = match.group(1)
-                else:
-                    continue
-            else:
-                continue
-            
-            if len(query) > 10:  # Valid query
+            if isinstance(query, str) and len(query) > 10:  # Valid query
                 queries.append({
                     "query_id": f"{domain_key}_gemini_{len(queries)+1}",
                     "domain": domain_key,
@@ -335,13 +575,11 @@ class GeminiAnalyzer:
                     "query_type": "gemini_enhanced",
                     "source": "llm_generated"
                 })
-        
-        return queries[:max_queries]  # Ensure we don't exceed the limit
+        return queries
     
     def _fallback_query_generation(self, domain_key: str, query_count: int = 20) -> List[Dict]:
         """Fallback query generation when Gemini is not available"""
-        domain_context = self.domain_contexts.get(domain_key, {})
-        industry = domain_context.get('industry', domain_key)
+        industry = self._domain_const.get(domain_key, _DEFAULT_DC).industry or domain_key
         industry_type = self._get_industry_type(domain_key)
         
         # Create domain-appropriate queries
@@ -395,138 +633,335 @@ class GeminiAnalyzer:
         
         return queries
     
-    def analyze_search_result_with_llm(self, result: Dict, domain_key: str, original_analysis) -> StructuredDataPoint:
+    def analyze_search_result_with_llm(self, result: Dict, domain_key: str) -> StructuredDataPoint:
         """Analyze search result using Gemini for structured output"""
-        if not self.enabled:
-            return self._convert_to_structured_format(result, domain_key, original_analysis)
+        if not self._llm_ready():
+            return self._convert_to_structured_format(result, domain_key)
+        
+        return self.analyze_batch([result], domain_key)[0]
+    
+    def analyze_batch(self, results: List[Dict], domain_key: str,
+                      batch_size: int = GEMINI_BATCH_SIZE) -> List[StructuredDataPoint]:
+        """Analyze search results with one Gemini call per batch_size uncached results"""
+        if not self._llm_ready():
+            return self.convert_batch(results, domain_key)
         
+        keys, found, pending = self._lookup_analyses(results, domain_key)
+        pending = list(pending.items())
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            if not self._llm_ready():
+                continue
+            try:
+                prompt = self._create_batch_prompt([result for _, result in chunk], domain_key)
+                response_text = self._generate(prompt, _BATCH_ANALYSIS_CONFIG)
+                found.update(self._store_analyses(chunk, response_text))
+            except Exception as e:
+                logger.error(f"Gemini batch analysis failed: {e}")
+        return self._assemble_points(results, keys, found, domain_key)
+    
+    async def analyze_search_results_batch(self, results: List[Dict], domain_key: str,
+                                           concurrency: int = GEMINI_CONCURRENCY,
+                                           batch_size: int = GEMINI_BATCH_SIZE) -> List[StructuredDataPoint]:
+        """Analyze many search results concurrently, packing batch_size results per request"""
+        if not self._llm_ready():
+            return self.convert_batch(results, domain_key)
+        
+        # Only results without a cached analysis are sent, duplicates once
+        keys, found, pending = await asyncio.to_thread(self._lookup_analyses, results, domain_key)
+        pending = list(pending.items())
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        chunks = await asyncio.gather(*[
+            self._analyze_chunk(pending[start:start + batch_size], domain_key, semaphore)
+            for start in range(0, len(pending), batch_size)
+        ])
+        for analyses in chunks:
+            found.update(analyses)
+        return self._assemble_points(results, keys, found, domain_key)
+    
+    def analyze_search_results_batch_sync(self, results: List[Dict], domain_key: str,
+                                          concurrency: int = GEMINI_CONCURRENCY,
+                                          batch_size: int = GEMINI_BATCH_SIZE) -> List[StructuredDataPoint]:
+        """Synchronous wrapper around analyze_search_results_batch"""
+        return self._run_on_loop(self.analyze_search_results_batch(
+            results, domain_key, concurrency, batch_size
+        ))
+    
+    def _run_on_loop(self, coro):
+        """Run a coroutine on the analyzer's event loop thread, blocking until it finishes"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='gemini-event-loop', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    async def _analyze_chunk(self, chunk: List[Tuple[str, Dict]], domain_key: str,
+                             semaphore: asyncio.Semaphore) -> Dict[str, Dict]:
+        """Analyze one packed batch of (cache key, result) pairs asynchronously"""
         try:
-            domain_context = self.domain_contexts.get(domain_key, {})
-            
-            prompt = f"""
-            Analyze this search result for the {domain_context.get('industry')} sector and provide structured analysis:
-
-            Search Result:
-            - Title: {result.get('title', '')}
-            - URL: {result.get('link', '')}
-            - Description: {result.get('snippet', '')}
-
-            Domain Context: {domain_context.get('industry')}
-            Key Sectors: {', '.join(domain_context.get('key_sectors', []))}
-
-            Please analyze and provide EXACTLY these fields:
-            1. INDUSTRY: {domain_context.get('industry')}
-            2. SECTOR: (Which specific sector within the industry - choose from: {', '.join(domain_context.get('key_sectors', []))})
-            3. DOCUMENT_TITLE: (Clean, descriptive title)
-            4. DATA_LINK: {result.get('link', '')}
-            5. FORMAT: (Website/PDF/Excel/Word/API - determine from URL and content)
-            6. ACTION_REQUIRED: (Website Crawling/PDF Download/Manual Copy/API Integration/Registration Required)
-            7. DATAPOINTS_CONTAINED: (What type of data: company names, contact details, financial data, etc.)
-            8. NO_OF_DATAPOINTS: (Estimated number - be specific, e.g., 150, 500, 1200)
-            9. COVERAGE: (Geographic scope: All India/State-specific/Regional/City-specific)
-            10. SOURCE: (Organization or website name)
-            11. YEAR: (Publication year if mentioned, otherwise 'Unknown')
-            12. ADDITIONAL_COMMENT: (Relevance, data quality, special notes)
-
-            Respond in this exact format:
-            INDUSTRY: [value]
-            SECTOR: [value]
-            DOCUMENT_TITLE: [value]
-            DATA_LINK: [value]
-            FORMAT: [value]
-            ACTION_REQUIRED: [value]
-            DATAPOINTS_CONTAINED: [value]
-            NO_OF_DATAPOINTS: [value]
-            COVERAGE: [value]
-            SOURCE: [value]
-            YEAR: [value]
-            ADDITIONAL_COMMENT: [value]
-            """
-            
-            if self.model and hasattr(self.model, 'generate_content'):
-                try:
-                    response = self.model.generate_content(prompt)
-                    if response and hasattr(response, 'text'):
-                        return self._parse_structured_response(response.text, result, domain_key)
-                    else:
-                        logger.warning("Invalid response from Gemini model")
-                        return self._convert_to_structured_format(result, domain_key, original_analysis)
-                except Exception as e:
-                    logger.error(f"Error generating content with Gemini: {e}")
-                    return self._convert_to_structured_format(result, domain_key, original_analysis)
-            else:
-                logger.warning("Model not available for content generation")
-                return self._convert_to_structured_format(result, domain_key, original_analysis)
-            
+            prompt = self._create_batch_prompt([result for _, result in chunk], domain_key)
+            async with semaphore:
+                if not self._llm_ready():
+                    return {}
+                response_text = await self._agenerate(prompt, _BATCH_ANALYSIS_CONFIG)
+            return await asyncio.to_thread(self._store_analyses, chunk, response_text)
         except Exception as e:
-            logger.error(f"Gemini analysis failed: {e}")
-            return self._convert_to_structured_format(result, domain_key, original_analysis)
+            logger.error(f"Error generating content with Gemini: {e}")
+        return {}
+    
+    def _llm_ready(self) -> bool:
+        """True when Gemini is enabled and the circuit breaker is closed"""
+        return self.enabled and time.monotonic() >= self._circuit_open_until
+    
+    def _record_success(self):
+        """Reset the circuit breaker's failure count"""
+        with self._breaker_lock:
+            self._consecutive_failures = 0
+    
+    def _record_failure(self):
+        """Count a failed Gemini call, opening the circuit after GEMINI_BREAKER_THRESHOLD in a row"""
+        with self._breaker_lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures < GEMINI_BREAKER_THRESHOLD:
+                return
+            self._circuit_open_until = time.monotonic() + GEMINI_BREAKER_COOLDOWN
+            self._consecutive_failures = 0
+        logger.warning(f"{GEMINI_BREAKER_THRESHOLD} consecutive Gemini failures, "
+                       f"using rule-based analysis for {GEMINI_BREAKER_COOLDOWN}s")
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff delay before retry number attempt + 1"""
+        return min(GEMINI_RETRY_MAX_DELAY, GEMINI_RETRY_BASE_DELAY * 2 ** attempt)
     
-    def _parse_structured_response(self, response_text: str, result: Dict, domain_key: str) -> StructuredDataPoint:
-        """Parse Gemini structured response"""
+    def _generate(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        """Generate content, retrying rate-limit/availability errors with exponential backoff"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                text = self.model.generate_content(prompt, generation_config=generation_config).text
+            except self._retryable_errors as e:
+                if attempt == MAX_RETRIES - 1:
+                    self._record_failure()
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Gemini attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            except Exception:
+                self._record_failure()
+                raise
+            else:
+                self._record_success()
+                return text
+    
+    async def _agenerate(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        """Async counterpart of _generate; each attempt is bounded by GEMINI_TIMEOUT"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt, generation_config=generation_config),
+                    timeout=GEMINI_TIMEOUT
+                )
+                text = response.text
+            except self._retryable_errors as e:
+                if attempt == MAX_RETRIES - 1:
+                    self._record_failure()
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Gemini attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                self._record_failure()
+                raise
+            else:
+                self._record_success()
+                return text
+    
+    def _cached_generate(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        """Return the response text for a prompt, calling Gemini only on a cache miss"""
+        key = self._prompt_key(prompt)
+        text = self.response_cache.get(key)
+        if text is None:
+            text = self._generate(prompt, generation_config)
+            self._store_response(key, text)
+        return text
+    
+    async def _acached_generate(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        """Async counterpart of _cached_generate"""
+        key = self._prompt_key(prompt)
+        text = self.response_cache.get(key)
+        if text is None:
+            text = await self._agenerate(prompt, generation_config)
+            self._store_response(key, text)
+        return text
+    
+    @staticmethod
+    def _prompt_key(prompt: str) -> str:
+        """Cache key for a prompt"""
+        return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _result_key(result: Dict, domain_key: str) -> str:
+        """Cache key for the analysis of one search result within a domain"""
+        parts = ('analysis', domain_key, result.get('link', ''), result.get('title', ''), result.get('snippet', ''))
+        return hashlib.blake2b('\x1f'.join(parts).encode(), digest_size=16).hexdigest()
+    
+    def _store_response(self, key: str, value):
+        """Store a response text or parsed analysis in the cache"""
+        if isinstance(self.response_cache, dict):
+            self.response_cache[key] = value
+        else:
+            self.response_cache.set(key, value, expire=LLM_CACHE_TTL)
+    
+    def _lookup_analyses(self, results: List[Dict], domain_key: str) -> Tuple[List[str], Dict[str, Dict], Dict[str, Dict]]:
+        """Cache key per result, cached analysis fields by key, and one uncached result per key"""
+        keys = [self._result_key(result, domain_key) for result in results]
+        found = {}
+        pending = {}
+        for key, result in zip(keys, results):
+            if key in found or key in pending:
+                continue
+            fields = self.response_cache.get(key)
+            if fields is None:
+                pending[key] = result
+            else:
+                found[key] = fields
+        return keys, found, pending
+    
+    def _store_analyses(self, chunk: List[Tuple[str, Dict]], response_text: str) -> Dict[str, Dict]:
+        """Parse a batch response and cache each result's fields; raises if the response is not valid JSON"""
+        items = self._parse_batch_items(response_text)
+        analyses = {}
+        for position, (key, _) in enumerate(chunk, 1):
+            fields = items.get(position)
+            if fields is not None:
+                analyses[key] = fields
+                self._store_response(key, fields)
+        return analyses
+    
+    def _assemble_points(self, results: List[Dict], keys: List[str], found: Dict[str, Dict],
+                         domain_key: str) -> List[StructuredDataPoint]:
+        """Build points from analysis fields, falling back to rule-based analysis for results without any"""
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        fallback = dict(zip(missing, self.convert_batch([results[i] for i in missing], domain_key)))
+        return [
+            fallback[i] if key not in found else self._point_from_fields(found[key], result, domain_key)
+            for i, (key, result) in enumerate(zip(keys, results))
+        ]
+    
+    def _open_response_cache(self):
+        """Open the persistent response cache, or an in-process dict if diskcache is missing"""
+        if not DISKCACHE_AVAILABLE:
+            logger.info("diskcache not installed, Gemini responses are cached in memory only")
+            return {}
         try:
-            fields = {}
-            for line in response_text.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    fields[key.strip().lower().replace('_', '')] = value.strip()
-            
-            return StructuredDataPoint(
-                industry=fields.get('industry', self.domain_contexts.get(domain_key, {}).get('industry', domain_key)),
-                sector=fields.get('sector', 'General'),
-                document_title=fields.get('documenttitle', result.get('title', 'Unknown')),
-                data_link=fields.get('datalink', result.get('link', '')),
-                format=fields.get('format', 'Website'),
-                action_required=fields.get('actionrequired', 'Website Crawling'),
-                datapoints_contained=fields.get('datapointscontained', 'Company Information'),
-                no_of_datapoints=self._extract_number(fields.get('noofdatapoints', '100')),
-                coverage=fields.get('coverage', 'All India'),
-                source=fields.get('source', 'Unknown'),
-                year=fields.get('year', 'Unknown'),
-                additional_comment=fields.get('additionalcomment', 'Requires further analysis')
-            )
-            
+            return diskcache.Cache(os.path.join(CACHE_DIR, 'gemini'))
         except Exception as e:
-            logger.error(f"Failed to parse structured response: {e}")
-            return self._convert_to_structured_format(result, domain_key, None)
+            logger.warning(f"Could not open Gemini response cache, using in-memory cache: {e}")
+            return {}
+    
+    def _create_batch_prompt(self, results: List[Dict], domain_key: str) -> str:
+        """Create one structured analysis prompt covering several search results"""
+        dc = self._domain_const.get(domain_key, _DEFAULT_DC)
+        industry = dc.industry or domain_key
+        sectors = dc.sectors_csv
+        
+        blocks = '\n'.join(
+            f"[{i}] Title: {result.get('title', '')}\n"
+            f"    URL: {result.get('link', '')}\n"
+            f"    Description: {result.get('snippet', '')}"
+            for i, result in enumerate(results, 1)
+        )
+        
+        return f"""
+Analyze these {len(results)} search results for the {industry} sector and provide structured analysis for each one.
+
+Domain Context: {industry}
+Key Sectors: {sectors}
+
+Search Results:
+{blocks}
+
+For EVERY search result provide an object with these fields:
+- index: The number of the search result in brackets
+- industry: {industry}
+- sector: Which specific sector within the industry - choose from: {sectors}
+- document_title: Clean, descriptive title
+- data_link: The URL of the search result
+- format: Website/PDF/Excel/Word/API - determine from URL and content
+- action_required: Website Crawling/PDF Download/Manual Copy/API Integration/Registration Required
+- datapoints_contained: What type of data: company names, contact details, financial data, etc.
+- no_of_datapoints: Estimated number - be specific, e.g., 150, 500, 1200
+- coverage: Geographic scope: All India/State-specific/Regional/City-specific
+- source: Organization or website name
+- year: Publication year if mentioned, otherwise 'Unknown'
+- additional_comment: Relevance, data quality, special notes
+
+Respond with JSON of the form {{"results": [{{...}}, {{...}}]}} containing one object per search result.
+"""
+    
+    @staticmethod
+    def _parse_batch_items(response_text: str) -> Dict[int, Dict]:
+        """Analysis objects of a structured JSON response by their 1-based result index"""
+        data = _json_loads(response_text)
+        items = data.get('results', []) if isinstance(data, dict) else data
+        
+        by_index = {}
+        for position, item in enumerate(items, 1):
+            if isinstance(item, dict):
+                by_index.setdefault(item.get('index', position), item)
+        return by_index
+    
+    def _point_from_fields(self, fields: Dict, result: Dict, domain_key: str) -> StructuredDataPoint:
+        """Build a StructuredDataPoint from one object of a structured Gemini response"""
+        return StructuredDataPoint(
+            industry=fields.get('industry', self._domain_const.get(domain_key, _DEFAULT_DC).industry or domain_key),
+            sector=fields.get('sector', 'General'),
+            document_title=fields.get('document_title', result.get('title', 'Unknown')),
+            data_link=fields.get('data_link', result.get('link', '')),
+            format=fields.get('format', 'Website'),
+            action_required=fields.get('action_required', 'Website Crawling'),
+            datapoints_contained=fields.get('datapoints_contained', 'Company Information'),
+            no_of_datapoints=self._extract_number(fields.get('no_of_datapoints', 100)),
+            coverage=fields.get('coverage', 'All India'),
+            source=fields.get('source', 'Unknown'),
+            year=str(fields.get('year', 'Unknown')),
+            additional_comment=fields.get('additional_comment', 'Requires further analysis')
+        )
     
     def _extract_number(self, text: str) -> int:
         """Extract number from text"""
-        numbers = re.findall(r'\d+', str(text))
-        return int(numbers[0]) if numbers else 100
+        match = _DIGITS_RE.search(str(text))
+        return int(match.group()) if match else 100
     
-    def _convert_to_structured_format(self, result: Dict, domain_key: str, original_analysis) -> StructuredDataPoint:
-        """Convert basic analysis to structured format"""
-        domain_context = self.domain_contexts.get(domain_key, {})
-        
-        # Determine format from URL
-        url = result.get('link', '').lower()
-        if '.pdf' in url:
-            format_type = 'PDF'
-            action = 'PDF Download'
-        elif any(ext in url for ext in ['.xlsx', '.xls']):
-            format_type = 'Excel'
-            action = 'PDF Download'
-        elif 'api' in url:
-            format_type = 'API'
-            action = 'API Integration'
-        else:
-            format_type = 'Website'
-            action = 'Website Crawling'
+    def convert_batch(self, results: List[Dict], domain_key: str) -> List[StructuredDataPoint]:
+        """Convert many search results to structured format without LLM analysis"""
+        dc = self._domain_const.get(domain_key, _DEFAULT_DC)
+        industry = dc.industry or domain_key
         
-        # Estimate datapoints
-        title_text = result.get('title', '').lower()
-        snippet_text = result.get('snippet', '').lower()
+        return [
+            self._build_structured_point(result, industry, dc.first_sector, classification)
+            for result, classification in zip(results, classify_batch(results))
+        ]
+    
+    def _convert_to_structured_format(self, result: Dict, domain_key: str) -> StructuredDataPoint:
+        """Convert basic analysis to structured format"""
+        dc = self._domain_const.get(domain_key, _DEFAULT_DC)
         
-        datapoints = 100  # Default
-        if any(word in title_text + snippet_text for word in ['comprehensive', 'complete', 'all']):
-            datapoints = 1000
-        elif any(word in title_text + snippet_text for word in ['directory', 'database']):
-            datapoints = 500
+        return self._build_structured_point(
+            result,
+            dc.industry or domain_key,
+            dc.first_sector,
+            _classify_result(result.get('link', ''), result.get('title', ''), result.get('snippet', ''))
+        )
+    
+    def _build_structured_point(self, result: Dict, industry: str, sector: str,
+                                classification: Tuple[str, str, int, str]) -> StructuredDataPoint:
+        """Materialize a classified search result as a StructuredDataPoint"""
+        format_type, action, datapoints, source = classification
         
         return StructuredDataPoint(
-            industry=domain_context.get('industry', domain_key),
-            sector=domain_context.get('key_sectors', ['General'])[0],
+            industry=industry,
+            sector=sector,
             document_title=result.get('title', 'Unknown'),
             data_link=result.get('link', ''),
             format=format_type,
@@ -534,7 +969,7 @@ class GeminiAnalyzer:
             datapoints_contained='Company Information, Contact Details',
             no_of_datapoints=datapoints,
             coverage='All India',
-            source=result.get('link', '').split('/')[2] if '//' in result.get('link', '') else 'Unknown',
+            source=source,
             year='Unknown',
             additional_comment='Standard analysis - LLM enhancement available'
         )
@@ -0,0 +1,46 @@
+"""
+Rate limiting shared by the search engines
+Token bucket usable from threads and from asyncio code alike
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second, holding at most `capacity`"""
+    
+    def __init__(self, rate: Optional[float], capacity: int = 1):
+        self.rate = rate  # None or <= 0 disables limiting
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        if not self.rate or self.rate <= 0:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Going negative reserves a future token, so concurrent waiters queue up in order
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self):
+        """Block until a token is available"""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+    
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a token is available"""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
@@ -0,0 +1,50 @@
+"""
+Retry policy shared by the search engines
+Decides which request failures to retry, how long to back off, and how to log them safely
+"""
+
+import asyncio
+import random
+import re
+
+import requests
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+from config.config import SEARCH_BACKOFF_BASE, SEARCH_BACKOFF_MAX, SEARCH_BACKOFF_JITTER
+
+# Network-level failures worth retrying; HTTP errors are judged by status code instead
+_RETRYABLE_ERRORS = (
+    TimeoutError, asyncio.TimeoutError, ConnectionError,
+    requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+) + ((aiohttp.ClientConnectionError,) if AIOHTTP_AVAILABLE else ())
+
+# Request URLs embedded in exception text carry the SerpAPI key as a query parameter
+_API_KEY_RE = re.compile(r'(api_key=)[^&\s\'"]+')
+
+def is_retryable(error: Exception) -> bool:
+    """True for timeouts, connection failures, HTTP 429 and 5xx; deterministic errors fail fast"""
+    status = getattr(error, 'status', None)  # aiohttp.ClientResponseError
+    if status is None and isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, _RETRYABLE_ERRORS)
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with random jitter so parallel retries do not wake in lockstep"""
+    delay = SEARCH_BACKOFF_BASE * 2 ** attempt * (1 + random.random() * SEARCH_BACKOFF_JITTER)
+    return min(SEARCH_BACKOFF_MAX, delay)
+
+def describe_error(error: Exception) -> str:
+    """Loggable description of a request failure that never includes the API key"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return f"HTTP {error.response.status_code} {error.response.reason}"
+    if AIOHTTP_AVAILABLE and isinstance(error, aiohttp.ClientResponseError):
+        return f"HTTP {error.status} {error.message}"
+    return _API_KEY_RE.sub(r'\1***', str(error)) or type(error).__name__
@@ -3,40 +3,124 @@ Intelligent Search Engine for Manufacturing Data Collection
 Handles search queries and result analysis using SerpAPI
 """
 
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import threading
 import time
 import logging
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from itertools import islice
+from operator import attrgetter
+from typing import List, Dict, Optional, Tuple
 
-# Try importing SerpAPI with error handling
+import requests
+from requests.adapters import HTTPAdapter
+
+# Concurrent batch search talks to the SerpAPI JSON endpoint directly
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+# SerpAPI payloads are decoded with orjson when available (its errors subclass ValueError)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# SerpAPI responses persist across runs when diskcache is available
 try:
-    from serpapi import GoogleSearch
-    SERPAPI_AVAILABLE = True
+    import diskcache
+    DISKCACHE_AVAILABLE = True
 except ImportError:
-    print("⚠️  SerpAPI not installed. Install with: pip install google-search-results")
-    SERPAPI_AVAILABLE = False
-    GoogleSearch = None
+    DISKCACHE_AVAILABLE = False
+    diskcache = None
 
-from src.core.data_analyzer import DataSourceAnalyzer, DataSourceAnalysis
-from config.config import SERPAPI_KEY, SEARCH_DELAY, MAX_RETRIES, RESULTS_PER_QUERY
+from src.core.data_analyzer import DataSourceAnalyzer, DataSourceAnalysis, QueryResult
+from src.core.rate_limiter import TokenBucket
+from src.core.retry import is_retryable, backoff_delay, describe_error
+from config.config import (SERPAPI_KEY, SEARCH_DELAY, SEARCH_BURST, MAX_RETRIES, RESULTS_PER_QUERY,
+                           SEARCH_CONCURRENCY, SERPAPI_TIMEOUT, SEARCH_CACHE_SIZE, ANALYSIS_CACHE_SIZE,
+                           SEARCH_CACHE_TTL, CACHE_DIR)
 
 logger = logging.getLogger(__name__)
 
+SERPAPI_ENDPOINT = "https://serpapi.com/search.json"
+
+# Queries differing only in case or whitespace share one search within a batch
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _canonical_query(query: str) -> str:
+    """Normalize a query string for duplicate detection"""
+    return _WHITESPACE_RE.sub(' ', query.strip().lower())
+
+# Analyzed results below this relevance are dropped before ranking
+MIN_RELEVANCE = 0.3
+_by_confidence = attrgetter('confidence_score')
+
 class SearchEngine:
     """Intelligent search engine for discovering manufacturing data sources"""
     
-    def __init__(self, api_key: Optional[str] = None):
-        if not SERPAPI_AVAILABLE:
-            raise ImportError("SerpAPI not available. Install with: pip install google-search-results")
-        
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True,
+                 cache_ttl: Optional[int] = None):
         self.api_key = api_key or SERPAPI_KEY
         if not self.api_key:
             raise ValueError("SerpAPI key is required. Set SERPAPI_KEY environment variable.")
         
-        self.analyzer = DataSourceAnalyzer()
+        self._analyzer = None  # built on first analyzed result
         self.search_count = 0
+        self._count_lock = threading.Lock()  # batch searches may run from several threads
         self.max_results = RESULTS_PER_QUERY
+        
+        # Pooled keep-alive connections to SerpAPI; retries are handled in _execute_search
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+        self._async_session = None
+        self._async_session_loop = None  # aiohttp sessions only work on the loop that created them
+        
+        # One request per SEARCH_DELAY on average, with short bursts; shared by sync and async paths
+        self._limiter = TokenBucket(1 / SEARCH_DELAY if SEARCH_DELAY > 0 else None, SEARCH_BURST)
+        
+        # (expiry time, raw SerpAPI response) keyed by (query, location, num), least recently used first
+        self._response_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_ttl = SEARCH_CACHE_TTL if cache_ttl is None else cache_ttl
+        self._disk_cache = self._open_disk_cache() if use_cache else None  # behind the in-memory LRU, survives reruns
+        
+        # Analyses keyed by (link, title, snippet, target_domain); the same hit recurs across queries
+        self._analysis_cache = OrderedDict()
+    
+    @property
+    def analyzer(self) -> DataSourceAnalyzer:
+        """Result analyzer, created on first use"""
+        if self._analyzer is None:
+            self._analyzer = DataSourceAnalyzer()
+        return self._analyzer
     
-    def search_query(self, query: str, target_domain: str, location: str = "India") -> Dict:
+    async def __aenter__(self):
+        """Open a pooled HTTP session shared by every async search until exit"""
+        self._async_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=SERPAPI_TIMEOUT))
+        self._async_session_loop = asyncio.get_running_loop()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._async_session.close()
+        self._async_session = None
+        self._async_session_loop = None
+    
+    def search_query(self, query: str, target_domain: str, location: str = "India") -> QueryResult:
         """Execute a single search query and analyze results"""
         logger.info(f"Searching: {query}")
         
@@ -48,127 +132,312 @@ class SearchEngine:
                 logger.warning(f"No results found for query: {query}")
                 return self._create_empty_result(query, target_domain)
             
-            # Analyze each result
-            analyzed_results = []
-            for result in search_results['organic_results'][:self.max_results]:
-                try:
-                    analysis = self.analyzer.analyze_search_result(result, target_domain)
-                    analyzed_results.append(analysis)
-                except Exception as e:
-                    logger.error(f"Error analyzing result: {e}")
-                    continue
+            query_result = self._build_query_result(query, target_domain, search_results)
+            with self._count_lock:
+                self.search_count += 1
             
-            # Filter and sort results
-            filtered_results = self._filter_results(analyzed_results)
+            return query_result
             
-            # Create query result summary
-            query_result = {
-                "query": query,
-                "target_domain": target_domain,
-                "total_results": len(search_results['organic_results']),
-                "analyzed_results": len(analyzed_results),
-                "relevant_results": len(filtered_results),
-                "results": filtered_results,
-                "search_metadata": {
-                    "search_time": search_results.get('search_metadata', {}).get('total_time_taken', 0),
-                    "results_available": search_results.get('search_information', {}).get('total_results', 0)
-                }
-            }
+        except Exception as e:
+            error = describe_error(e)
+            logger.error(f"Search failed for query '{query}': {error}")
+            return self._create_error_result(query, target_domain, error)
+    
+    async def search_query_async(self, session, query: str, target_domain: str, location: str = "India") -> QueryResult:
+        """Async counterpart of search_query using a shared aiohttp session"""
+        logger.info(f"Searching: {query}")
+        
+        try:
+            search_results = await self._execute_search_async(session, query, location)
+            
+            if not search_results or 'organic_results' not in search_results:
+                logger.warning(f"No results found for query: {query}")
+                return self._create_empty_result(query, target_domain)
             
-            # Add delay between searches
-            time.sleep(SEARCH_DELAY)
-            self.search_count += 1
+            # Analyze on a worker thread so the event loop keeps other searches' I/O moving
+            query_result = await asyncio.get_running_loop().run_in_executor(
+                None, self._build_query_result, query, target_domain, search_results
+            )
+            with self._count_lock:
+                self.search_count += 1
             
             return query_result
             
         except Exception as e:
-            logger.error(f"Search failed for query '{query}': {e}")
-            return self._create_error_result(query, target_domain, str(e))
+            error = describe_error(e)
+            logger.error(f"Search failed for query '{query}': {error}")
+            return self._create_error_result(query, target_domain, error)
+    
+    def _build_query_result(self, query: str, target_domain: str, search_results: Dict) -> QueryResult:
+        """Analyze and filter raw SerpAPI results into a query result summary"""
+        # Analyze each well-formed result, dropping any that still fail
+        analyzed_results = [
+            analysis
+            for analysis in (self._analyze_result(result, target_domain)
+                             for result in islice(search_results['organic_results'], self.max_results)
+                             if DataSourceAnalyzer.can_analyze(result))
+            if analysis is not None
+        ]
+        
+        # Filter and sort results
+        filtered_results = self._filter_results(analyzed_results)
+        
+        # Create query result summary
+        return QueryResult(
+            query=query,
+            target_domain=target_domain,
+            total_results=len(search_results['organic_results']),
+            analyzed_results=len(analyzed_results),
+            relevant_results=len(filtered_results),
+            results=filtered_results,
+            search_metadata={
+                "search_time": search_results.get('search_metadata', {}).get('total_time_taken', 0),
+                "results_available": search_results.get('search_information', {}).get('total_results', 0)
+            }
+        )
+    
+    def _analyze_result(self, result: Dict, target_domain: str) -> Optional[DataSourceAnalysis]:
+        """Analyze an organic result, reusing the analysis of an identical earlier hit; None if analysis fails"""
+        try:
+            key = (result.get('link', ''), result.get('title', ''), result.get('snippet', ''), target_domain)
+            with self._cache_lock:
+                analysis = self._analysis_cache.get(key)
+                if analysis is not None:
+                    self._analysis_cache.move_to_end(key)
+                    return analysis
+            
+            analysis = self.analyzer.analyze_search_result(result, target_domain)
+        except Exception as e:
+            logger.error(f"Error analyzing result: {e}")
+            return None
+        with self._cache_lock:
+            self._analysis_cache[key] = analysis
+            if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        return analysis
+    
+    def _search_params(self, query: str, location: str) -> Dict:
+        """SerpAPI request parameters for a query"""
+        return {
+            "engine": "google",
+            "q": query,
+            "location": location,
+            "api_key": self.api_key,
+            "num": self.max_results,
+            "start": 0
+        }
     
     def _execute_search(self, query: str, location: str) -> Optional[Dict]:
-        """Execute search using SerpAPI with retry logic"""
-        if not SERPAPI_AVAILABLE or not GoogleSearch:
-            raise ImportError("SerpAPI not available")
+        """Execute search against the SerpAPI JSON endpoint with retry logic"""
+        cache_key = (query, location, self.max_results)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
         for attempt in range(MAX_RETRIES):
             try:
-                search = GoogleSearch({
-                    "q": query,
-                    "location": location,
-                    "api_key": self.api_key,
-                    "num": self.max_results,
-                    "start": 0
-                })
+                self._limiter.acquire()
+                response = self._session.get(
+                    SERPAPI_ENDPOINT, params=self._search_params(query, location), timeout=(5, SERPAPI_TIMEOUT)
+                )
+                response.raise_for_status()
                 
-                results = search.get_dict()
+                results = _json_loads(response.content)
+                self._cache_put(cache_key, results)
                 return results
                 
             except Exception as e:
-                logger.warning(f"Search attempt {attempt + 1} failed: {e}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                logger.warning(f"Search attempt {attempt + 1} failed: {describe_error(e)}")
+                if attempt < MAX_RETRIES - 1 and is_retryable(e):
+                    time.sleep(backoff_delay(attempt))
                 else:
                     raise e
         
         return None
     
-    def _filter_results(self, results: List[DataSourceAnalysis]) -> List[DataSourceAnalysis]:
-        """Filter results based on relevance and quality"""
-        # Filter by minimum relevance score
-        min_relevance = 0.3
-        filtered = [r for r in results if r.relevance_score >= min_relevance]
+    async def _execute_search_async(self, session, query: str, location: str) -> Optional[Dict]:
+        """Async counterpart of _execute_search on an aiohttp session"""
+        cache_key = (query, location, self.max_results)
+        # The cache may read disk, so it is used off the event loop
+        cached = await asyncio.to_thread(self._cache_get, cache_key)
+        if cached is not None:
+            return cached
         
-        # Sort by confidence score (descending)
-        filtered.sort(key=lambda x: x.confidence_score, reverse=True)
+        for attempt in range(MAX_RETRIES):
+            try:
+                await self._limiter.acquire_async()
+                async with session.get(SERPAPI_ENDPOINT, params=self._search_params(query, location)) as response:
+                    response.raise_for_status()
+                    results = _json_loads(await response.read())
+                await asyncio.to_thread(self._cache_put, cache_key, results)
+                return results
+                
+            except Exception as e:
+                logger.warning(f"Search attempt {attempt + 1} failed: {describe_error(e)}")
+                if attempt < MAX_RETRIES - 1 and is_retryable(e):
+                    await asyncio.sleep(backoff_delay(attempt))
+                else:
+                    raise e
+        
+        return None
+    
+    def _cache_get(self, key: Tuple) -> Optional[Dict]:
+        """Return an unexpired cached SerpAPI response from memory or disk, counting the hit or miss"""
+        with self._cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is not None:
+                expires, response = entry
+                if expires is None or expires > time.time():
+                    self._response_cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return response
+                del self._response_cache[key]
+        
+        response, expires = self._disk_get(key)
+        with self._cache_lock:
+            if response is None:
+                self.cache_misses += 1
+                return None
+            self.cache_hits += 1
+            self._remember(key, response, expires)
+        return response
+    
+    def _cache_put(self, key: Tuple, response: Dict):
+        """Cache a SerpAPI response unless it reports an error"""
+        if not isinstance(response, dict) or 'error' in response:
+            return
+        with self._cache_lock:
+            self._remember(key, response, time.time() + self.cache_ttl)
         
-        # Remove duplicates based on domain
-        seen_domains = set()
-        unique_results = []
-        for result in filtered:
-            if result.domain not in seen_domains:
-                unique_results.append(result)
-                seen_domains.add(result.domain)
+        if self._disk_cache is not None:
+            try:
+                self._disk_cache.set(self._disk_key(key), response, expire=self.cache_ttl)
+            except Exception as e:
+                logger.warning(f"Could not persist SerpAPI response: {e}")
+    
+    def _remember(self, key: Tuple, response: Dict, expires: Optional[float]):
+        """Insert into the in-memory LRU until `expires` (epoch seconds), evicting the least recently used; caller holds _cache_lock"""
+        self._response_cache[key] = (expires, response)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > SEARCH_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
+    def _disk_get(self, key: Tuple) -> Tuple[Optional[Dict], Optional[float]]:
+        """Look up a response and its expiry time in the persistent cache"""
+        if self._disk_cache is None:
+            return None, None
+        try:
+            return self._disk_cache.get(self._disk_key(key), expire_time=True)
+        except Exception as e:
+            logger.warning(f"Could not read SerpAPI response cache: {e}")
+            return None, None
+    
+    @staticmethod
+    def _disk_key(key: Tuple) -> str:
+        """Persistent cache key for a (query, location, num) triple"""
+        return hashlib.sha1('|'.join(map(str, key)).encode('utf-8')).hexdigest()
+    
+    def _open_disk_cache(self):
+        """Open the persistent SerpAPI response cache, or None if diskcache is missing"""
+        if not DISKCACHE_AVAILABLE:
+            logger.info("diskcache not installed, SerpAPI responses are cached in memory only")
+            return None
+        try:
+            return diskcache.Cache(os.path.join(CACHE_DIR, 'serpapi'))
+        except Exception as e:
+            logger.warning(f"Could not open SerpAPI response cache, using in-memory cache only: {e}")
+            return None
+    
+    def _filter_results(self, results: List[DataSourceAnalysis]) -> List[DataSourceAnalysis]:
+        """Filter results based on relevance and quality"""
+        # Keep the most confident relevant result per domain in one pass (earliest wins ties).
+        # A replaced entry is re-inserted so the dict stays in the survivors' original order.
+        best = {}
+        for result in results:
+            if result.relevance_score < MIN_RELEVANCE:
+                continue
+            current = best.get(result.domain)
+            if current is None:
+                best[result.domain] = result
+            elif result.confidence_score > current.confidence_score:
+                del best[result.domain]
+                best[result.domain] = result
         
-        return unique_results
+        # Stable sort by confidence score (descending), original order among equals
+        return sorted(best.values(), key=_by_confidence, reverse=True)
     
-    def _create_empty_result(self, query: str, target_domain: str) -> Dict:
+    def _create_empty_result(self, query: str, target_domain: str) -> QueryResult:
         """Create empty result structure"""
-        return {
-            "query": query,
-            "target_domain": target_domain,
-            "total_results": 0,
-            "analyzed_results": 0,
-            "relevant_results": 0,
-            "results": [],
-            "search_metadata": {
-                "search_time": 0,
-                "results_available": 0
-            },
-            "status": "no_results"
-        }
+        return QueryResult(query=query, target_domain=target_domain, status="no_results",
+                           search_metadata={"search_time": 0, "results_available": 0})
     
-    def _create_error_result(self, query: str, target_domain: str, error_msg: str) -> Dict:
+    def _create_error_result(self, query: str, target_domain: str, error_msg: str) -> QueryResult:
         """Create error result structure"""
-        return {
-            "query": query,
-            "target_domain": target_domain,
-            "total_results": 0,
-            "analyzed_results": 0,
-            "relevant_results": 0,
-            "results": [],
-            "search_metadata": {
-                "search_time": 0,
-                "results_available": 0
-            },
-            "status": "error",
-            "error_message": error_msg
-        }
+        return QueryResult(query=query, target_domain=target_domain, status="error", error_message=error_msg,
+                           search_metadata={"search_time": 0, "results_available": 0})
     
-    def batch_search(self, queries: List[Dict], target_domain: str) -> List[Dict]:
-        """Execute multiple search queries for a domain"""
+    def batch_search(self, queries: List[Dict], target_domain: str) -> Tuple[List[QueryResult], Dict]:
+        """Execute multiple search queries for a domain, returning the results and their running totals"""
+        if not AIOHTTP_AVAILABLE:
+            return self._batch_search_sequential(queries, target_domain)
+        return asyncio.run(self.batch_search_async(queries, target_domain))
+    
+    async def batch_search_async(self, queries: List[Dict], target_domain: str,
+                                 concurrency: int = SEARCH_CONCURRENCY) -> Tuple[List[QueryResult], Dict]:
+        """Execute multiple search queries concurrently, bounded by `concurrency` in-flight requests"""
+        logger.info(f"Starting batch search for {len(queries)} queries in domain: {target_domain}")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(session, query: str) -> QueryResult:
+            async with semaphore:
+                return await self.search_query_async(session, query, target_domain)
+        
+        async def run(session) -> Tuple[List[QueryResult], Dict]:
+            # Queries that canonicalize alike are searched once and the result is shared
+            tasks = {}
+            for query_info in queries:
+                canon = _canonical_query(query_info['search_query'])
+                if canon not in tasks:
+                    tasks[canon] = asyncio.ensure_future(bounded(session, query_info['search_query']))
+            
+            results = []
+            stats = self._new_batch_stats()
+            for i, query_info in enumerate(queries, 1):
+                logger.info(f"Processing query {i}/{len(queries)}")
+                try:
+                    result = dataclasses.replace(
+                        await tasks[_canonical_query(query_info['search_query'])],
+                        query=query_info['search_query'],
+                        query_id=query_info['query_id'],
+                        prompt_template=query_info.get('prompt_template', ''),
+                        query_type=query_info['query_type']
+                    )
+                except Exception as e:
+                    error = describe_error(e)
+                    logger.error(f"Failed to process query {i}: {error}")
+                    result = self._create_error_result(query_info['search_query'], target_domain, error)
+                results.append(result)
+                self._tally_result(stats, result)
+            return results, stats
+        
+        # Reuse the session opened by `async with engine`, unless it belongs to another event loop
+        # (batch_search runs each batch on a fresh loop via asyncio.run)
+        if self._async_session is not None and self._async_session_loop is asyncio.get_running_loop():
+            results, stats = await run(self._async_session)
+        else:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=SERPAPI_TIMEOUT)) as session:
+                results, stats = await run(session)
+        
+        logger.info(f"Completed batch search. Processed {len(results)} queries.")
+        return results, stats
+    
+    def _batch_search_sequential(self, queries: List[Dict], target_domain: str) -> Tuple[List[QueryResult], Dict]:
+        """Execute multiple search queries one at a time over the pooled requests session"""
         logger.info(f"Starting batch search for {len(queries)} queries in domain: {target_domain}")
         
         results = []
+        stats = self._new_batch_stats()
         for i, query_info in enumerate(queries, 1):
             logger.info(f"Processing query {i}/{len(queries)}")
             
@@ -177,28 +446,43 @@ class SearchEngine:
                     query_info['search_query'], 
                     target_domain
                 )
-                result.update({
-                    "query_id": query_info['query_id'],
-                    "prompt_template": query_info['prompt_template'],
-                    "query_type": query_info['query_type']
-                })
-                results.append(result)
+                result.query_id = query_info['query_id']
+                result.prompt_template = query_info.get('prompt_template', '')
+                result.query_type = query_info['query_type']
                 
             except Exception as e:
-                logger.error(f"Failed to process query {i}: {e}")
-                results.append(self._create_error_result(
+                error = describe_error(e)
+                logger.error(f"Failed to process query {i}: {error}")
+                result = self._create_error_result(
                     query_info['search_query'], 
                     target_domain, 
-                    str(e)
-                ))
+                    error
+                )
+            results.append(result)
+            self._tally_result(stats, result)
         
         logger.info(f"Completed batch search. Processed {len(results)} queries.")
-        return results
+        return results, stats
+    
+    def _new_batch_stats(self) -> Dict:
+        """Zeroed running totals for a batch search"""
+        return {"total_sources": 0, "successful_queries": 0, "error_queries": 0}
+    
+    def _tally_result(self, stats: Dict, result: QueryResult):
+        """Add one query result to a batch's running totals"""
+        stats["total_sources"] += len(result.results)
+        if result.status == 'error':
+            stats["error_queries"] += 1
+        else:
+            stats["successful_queries"] += 1
     
     def get_search_stats(self) -> Dict:
         """Get search statistics"""
         return {
             "total_searches": self.search_count,
             "max_results_per_query": self.max_results,
-            "search_delay": SEARCH_DELAY
+            "search_delay": SEARCH_DELAY,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_size": len(self._response_cache)
         }
@@ -3,32 +3,48 @@ Enhanced Main Application for Intelligent Manufacturing Data Collection
 Orchestrates the entire data discovery and directory creation process with LLM integration
 """
 
+import argparse
+import functools
 import logging
 import sys
 import os
 import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
-import re
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.domain_manager import DomainManager
-from src.core.enhanced_directory_creator import EnhancedDirectoryCreator
-from config.config import SERPAPI_KEY
+from src.core.data_analyzer import QueryResult
+from config.config import SERPAPI_KEY, DOMAIN_WORKERS
 
 logger = logging.getLogger(__name__)
 
+# Emoji decoration dropped from progress output when stdout is redirected
+_EMOJI_RE = re.compile('[\U0001F300-\U0001FAFF\u2600-\u27BF]\uFE0F? ?')
+
+def _progress(*lines: str):
+    """Write progress lines in a single write so parallel domains don't interleave mid-block"""
+    text = "\n".join(lines)
+    if not sys.stdout.isatty():
+        text = _EMOJI_RE.sub('', text)
+    sys.stdout.write(text + "\n")
+
 class ManufacturingDataCollector:
     """Enhanced main application class with LLM integration"""
     
-    def __init__(self, use_free_search: bool = True, use_llm: bool = True):
+    def __init__(self, use_free_search: bool = True, use_llm: bool = True,
+                 use_cache: bool = True, cache_ttl: Optional[int] = None):
         """Initialize the enhanced data collector"""
         self.use_llm = use_llm
         self.use_free_search = use_free_search
         
         # Initialize with LLM support
         self.domain_manager = DomainManager(use_llm=use_llm)
+        self.refresh_domains()
         
         # Initialize search engine (free or paid)
         if use_free_search:
@@ -39,15 +55,34 @@ class ManufacturingDataCollector:
             # Fallback to paid SerpAPI if needed
             try:
                 from src.core.search_engine import SearchEngine
-                self.search_engine = SearchEngine()
+                self.search_engine = SearchEngine(use_cache=use_cache, cache_ttl=cache_ttl)
             except Exception as e:
                 logger.warning(f"SerpAPI not available, switching to free search: {e}")
                 from src.core.free_search_engine import FreeSearchEngine
                 self.search_engine = FreeSearchEngine()
         
-        # Use enhanced directory creator
-        self.directory_creator = EnhancedDirectoryCreator(use_llm=use_llm)
+        # Enhanced directory creator (pandas/openpyxl) is loaded on first use
+        self._directory_creator = None
+        self._creator_lock = threading.Lock()
+        # Per-domain structured rows and search stats; rows are spilled to JSONL so finished
+        # domains don't keep their search results in memory until the master directory is built
         self.collected_data = {}
+        self._collected_lock = threading.Lock()
+        self._rows_dir = tempfile.TemporaryDirectory(prefix='data_directory_')
+    
+    def refresh_domains(self):
+        """Snapshot the domain keys and their info; call again after adding domains to the manager"""
+        self._domains = self.domain_manager.get_all_domains()
+        self._domains_info = {domain_key: self.domain_manager.get_domain_info(domain_key) for domain_key in self._domains}
+    
+    @property
+    def directory_creator(self):
+        """Enhanced directory creator, imported and built when first needed"""
+        with self._creator_lock:
+            if self._directory_creator is None:
+                from src.core.enhanced_directory_creator import EnhancedDirectoryCreator
+                self._directory_creator = EnhancedDirectoryCreator(use_llm=self.use_llm)
+            return self._directory_creator
     
     def run_interactive_mode(self):
         """Run the application in interactive mode"""
@@ -60,45 +95,33 @@ class ManufacturingDataCollector:
         print(f"Search Mode: {search_type}")
         print(f"Analysis Mode: {llm_status}")
         
-        # Show available domains
-        domains = self.domain_manager.get_all_domains()
-        print("\n📋 Available Domains:")
-        for i, domain_key in enumerate(domains, 1):
-            domain_info = self.domain_manager.get_domain_info(domain_key)
-            print(f"{i}. {domain_info.name}")
-        
-        print(f"{len(domains) + 1}. Custom Domain Entry")
-        print(f"{len(domains) + 2}. Process All Domains")
-        print(f"{len(domains) + 3}. Show Query Estimates")
+        # Menu options in display order; built once, then used for both printing and dispatch
+        domains = self._domains
+        menu = [(self._domains_info[domain_key].name, functools.partial(self.process_domain, domain_key))
+                for domain_key in domains]
+        menu.append(("Custom Domain Entry", self.process_custom_domain))
+        menu.append(("Process All Domains", self.process_all_domains))
+        menu.append(("Show Query Estimates", self.show_query_estimates))
         if self.use_llm:
-            print(f"{len(domains) + 4}. LLM Enhancement Demo")
+            menu.append(("LLM Enhancement Demo", self.show_llm_demo))
+        actions = {i: action for i, (_, action) in enumerate(menu, 1)}
+        
+        print("\n📋 Available Domains:")
+        for i, (label, _) in enumerate(menu, 1):
+            print(f"{i}. {label}")
         
+        prompt = f"\n🎯 Choose option (1-{len(menu)}) or 'q' to quit: "
         while True:
             try:
-                choice = input(f"\n🎯 Choose option (1-{len(domains) + 3}) or 'q' to quit: ").strip()
+                choice = input(prompt).strip()
                 
                 if choice.lower() == 'q':
                     print("👋 Goodbye!")
                     break
                 
-                choice_num = int(choice)
-                
-                if choice_num == len(domains) + 1:
-                    # Custom domain entry
-                    self.process_custom_domain()
-                elif choice_num == len(domains) + 2:
-                    # Process all domains
-                    self.process_all_domains()
-                elif choice_num == len(domains) + 3:
-                    # Show query estimates
-                    self.show_query_estimates()
-                elif choice_num == len(domains) + 4 and self.use_llm:
-                    # LLM Enhancement Demo
-                    self.show_llm_demo()
-                elif 1 <= choice_num <= len(domains):
-                    # Process specific domain
-                    domain_key = domains[choice_num - 1]
-                    self.process_domain(domain_key)
+                action = actions.get(int(choice))
+                if action is not None:
+                    action()
                 else:
                     print("❌ Invalid choice. Please try again.")
                 
@@ -111,72 +134,91 @@ class ManufacturingDataCollector:
                 logger.error(f"Unexpected error: {e}")
                 print(f"❌ An error occurred: {e}")
     
-    def process_domain(self, domain_key: str) -> str:
+    def process_domain(self, domain_key: str, query_count: Optional[int] = None) -> str:
         """Process a single domain and create directory"""
-        domain_info = self.domain_manager.get_domain_info(domain_key)
-        print(f"\n🔍 Processing Domain: {domain_info.name}")
-        print("-" * 40)
+        domain_info = self._domains_info[domain_key]
+        _progress(f"\n🔍 Processing Domain: {domain_info.name}", "-" * 40)
         
-        # Ask user for number of queries
-        query_count = self._get_query_count()
+        # Ask user for number of queries unless the caller already did
+        if query_count is None:
+            query_count = self._get_query_count()
         
         # Generate queries
-        print(f"📝 Generating {query_count} smart search queries...")
+        _progress(f"📝 Generating {query_count} smart search queries...")
         queries = self.domain_manager.generate_queries_for_domain(domain_key, query_count=query_count)
-        print(f"✅ Generated {len(queries)} queries")
+        _progress(f"✅ Generated {len(queries)} queries")
         
         # Execute searches
-        print(f"🔎 Starting search process...")
-        search_results = self.search_engine.batch_search(queries, domain_key)
+        _progress(f"🔎 Starting search process...")
+        search_results, search_stats = self.search_engine.batch_search(queries, domain_key)
         
         # Show search summary
-        total_sources = sum(len(result.get('results', [])) for result in search_results)
-        successful_queries = sum(1 for result in search_results if result.get('status') != 'error')
-        
-        print(f"📊 Search completed:")
-        print(f"   - Queries executed: {len(search_results)}")
-        print(f"   - Successful queries: {successful_queries}")
-        print(f"   - Data sources found: {total_sources}")
+        _progress(
+            f"📊 Search completed:",
+            f"   - Queries executed: {len(search_results)}",
+            f"   - Successful queries: {search_stats['successful_queries']}",
+            f"   - Data sources found: {search_stats['total_sources']}"
+        )
         
         # Create directory
-        print("📁 Creating structured Excel directory...")
+        _progress("📁 Creating structured Excel directory...")
+        rows_path = self._rows_path(domain_key)
         directory_path = self.directory_creator.create_structured_directory(
             domain_info.name, 
-            search_results
+            search_results,
+            rows_path
         )
         
         # Store results
-        self.collected_data[domain_key] = search_results
+        with self._collected_lock:
+            self.collected_data[domain_key] = {"rows": rows_path, "stats": search_stats}
         
-        print(f"✅ Directory created: {directory_path}")
+        _progress(f"✅ Directory created: {directory_path}")
         return directory_path
     
     def process_all_domains(self):
-        """Process all domains sequentially"""
-        print(f"\n🚀 Processing All Domains")
-        print("=" * 40)
+        """Process all domains in parallel"""
+        _progress(f"\n🚀 Processing All Domains", "=" * 40)
         
-        domains = self.domain_manager.get_all_domains()
+        domains = self._domains
         completed_domains = {}
         
-        for i, domain_key in enumerate(domains, 1):
-            domain_info = self.domain_manager.get_domain_info(domain_key)
-            print(f"\n[{i}/{len(domains)}] Processing: {domain_info.name}")
+        # Ask once up front; worker threads must not prompt for input
+        query_count = self._get_query_count()
+        
+        # The search engine's rate limiter is shared, so API limits hold across threads
+        with ThreadPoolExecutor(max_workers=max(1, min(DOMAIN_WORKERS, len(domains)))) as executor:
+            futures = {}
+            for i, domain_key in enumerate(domains, 1):
+                domain_info = self._domains_info[domain_key]
+                _progress(f"\n[{i}/{len(domains)}] Processing: {domain_info.name}")
+                futures[executor.submit(self.process_domain, domain_key, query_count)] = domain_key
             
-            try:
-                directory_path = self.process_domain(domain_key)
-                completed_domains[domain_info.name] = self.collected_data[domain_key]
-                print(f"✅ Completed: {domain_info.name}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process domain {domain_key}: {e}")
-                print(f"❌ Failed to process {domain_info.name}: {e}")
+            succeeded = set()
+            for future in as_completed(futures):
+                domain_key = futures[future]
+                domain_info = self._domains_info[domain_key]
+                try:
+                    future.result()
+                    succeeded.add(domain_key)
+                    _progress(f"✅ Completed: {domain_info.name}")
+                except Exception as e:
+                    logger.error(f"Failed to process domain {domain_key}: {e}")
+                    _progress(f"❌ Failed to process {domain_info.name}: {e}")
+        
+        # Only domains that succeeded in this run, in domain order regardless of completion order;
+        # collected_data may still hold rows from an earlier single-domain run
+        for domain_key in domains:
+            if domain_key in succeeded:
+                completed_domains[self._domains_info[domain_key].name] = self.collected_data[domain_key]
         
         # Create master directory
         if completed_domains:
-            print(f"\n📋 Creating master structured directory...")
-            master_path = self.directory_creator.create_master_structured_directory(completed_domains)
-            print(f"✅ Master directory created: {master_path}")
+            _progress(f"\n📋 Creating master structured directory...")
+            master_path = self.directory_creator.create_master_structured_directory(
+                {name: domain_data["rows"] for name, domain_data in completed_domains.items()}
+            )
+            _progress(f"✅ Master directory created: {master_path}")
         
         # Show final summary
         self.show_final_summary(completed_domains)
@@ -191,9 +233,9 @@ class ManufacturingDataCollector:
         print("• Queries are India-focused and domain-appropriate")
         print()
         
-        domains = self.domain_manager.get_all_domains()
+        domains = self._domains
         for domain_key in domains:
-            domain_info = self.domain_manager.get_domain_info(domain_key)
+            domain_info = self._domains_info[domain_key]
             print(f"{domain_info.name}: User-defined (recommend 20 queries)")
         
         print(f"\nEstimated time per query: ~4 seconds (free search)")
@@ -206,6 +248,12 @@ class ManufacturingDataCollector:
             print("💰 Cost: No SerpAPI costs with free search!")
     
     
+    def _rows_path(self, domain_key: str) -> str:
+        """JSONL file holding a domain's structured rows for the master directory"""
+        # Custom domain keys come from user input; keep path separators and '..' out of the file name
+        file_name = re.sub(r'[^\w-]', '_', domain_key)
+        return os.path.join(self._rows_dir.name, f"{file_name}.jsonl")
+    
     def show_final_summary(self, completed_domains: Dict):
         """Show final summary of all processed domains"""
         print(f"\n📈 Final Summary")
@@ -214,9 +262,9 @@ class ManufacturingDataCollector:
         total_sources = 0
         total_queries = 0
         
-        for domain_name, search_results in completed_domains.items():
-            domain_sources = sum(len(result.get('results', [])) for result in search_results)
-            domain_queries = len(search_results)
+        for domain_name, domain_data in completed_domains.items():
+            domain_sources = domain_data["stats"]["total_sources"]
+            domain_queries = domain_data["stats"]["successful_queries"] + domain_data["stats"]["error_queries"]
             
             print(f"\n{domain_name}:")
             print(f"  - Queries: {domain_queries}")
@@ -234,7 +282,7 @@ class ManufacturingDataCollector:
         stats = self.search_engine.get_search_stats()
         print(f"   - Search engine calls: {stats['total_searches']}")
     
-    def process_single_query(self, query: str, domain_key: str) -> Dict:
+    def process_single_query(self, query: str, domain_key: str) -> QueryResult:
         """Process a single query for testing purposes"""
         domain_info = self.domain_manager.get_domain_info(domain_key)
         result = self.search_engine.search_query(query, domain_key)
@@ -312,26 +360,26 @@ class ManufacturingDataCollector:
         print(f"🔎 Starting search process...")
         # Create a temporary domain key for this custom domain
         custom_domain_key = f"custom_{domain_name.lower().replace(' ', '_')}"
-        search_results = self.search_engine.batch_search(queries, custom_domain_key)
+        search_results, search_stats = self.search_engine.batch_search(queries, custom_domain_key)
         
         # Show search summary
-        total_sources = sum(len(result.get('results', [])) for result in search_results)
-        successful_queries = sum(1 for result in search_results if result.get('status') != 'error')
-        
         print(f"📊 Search completed:")
         print(f"   - Queries executed: {len(search_results)}")
-        print(f"   - Successful queries: {successful_queries}")
-        print(f"   - Data sources found: {total_sources}")
+        print(f"   - Successful queries: {search_stats['successful_queries']}")
+        print(f"   - Data sources found: {search_stats['total_sources']}")
         
         # Create directory
         print("📁 Creating structured Excel directory...")
+        rows_path = self._rows_path(custom_domain_key)
         directory_path = self.directory_creator.create_structured_directory(
             domain_name, 
-            search_results
+            search_results,
+            rows_path
         )
         
         # Store results
-        self.collected_data[custom_domain_key] = search_results
+        with self._collected_lock:
+            self.collected_data[custom_domain_key] = {"rows": rows_path, "stats": search_stats}
         
         print(f"✅ Custom domain directory created: {directory_path}")
         return directory_path
@@ -379,16 +427,36 @@ class ManufacturingDataCollector:
             logger.error(f"Demo failed: {e}")
             print(f"❌ Demo failed: {e}")
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Enhanced Manufacturing Data Collection System")
+    parser.add_argument('--serpapi', action='store_true',
+                        help="search with SerpAPI (needs SERPAPI_KEY) instead of the free search methods")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore and don't write the on-disk SerpAPI response cache")
+    parser.add_argument('--cache-ttl', type=int, default=None, metavar='SECONDS',
+                        help="how long cached SerpAPI responses stay valid (default: one day)")
+    return parser.parse_args(argv)
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    
     print("🏭 Enhanced Manufacturing Data Collection System")
     print("=======================================================")
-    print("🆓 Using FREE search methods - No API keys required!")
+    if args.serpapi:
+        print("💰 Using SerpAPI search")
+    else:
+        print("🆓 Using FREE search methods - No API keys required!")
     print()
     
     try:
         # Initialize the collector with FREE search by default
-        collector = ManufacturingDataCollector(use_free_search=True)
+        collector = ManufacturingDataCollector(
+            use_free_search=not args.serpapi,
+            use_cache=not args.no_cache,
+            cache_ttl=args.cache_ttl
+        )
         
         # Run interactive mode
         collector.run_interactive_mode()
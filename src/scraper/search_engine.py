@@ -1,86 +1,293 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import re
 import requests
+import threading
 import time
 import logging
-from typing import List, Dict, Optional
-from serpapi import GoogleSearch
-from config.config import SERPAPI_KEY, SEARCH_DELAY, MAX_RETRIES, RESULTS_PER_QUERY
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+# Concurrent batch search talks to the SerpAPI JSON endpoint directly
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+# Processed results persist across runs when diskcache is available
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    diskcache = None
+
+from src.core.rate_limiter import TokenBucket
+from src.core.retry import is_retryable, backoff_delay, describe_error
+from src.scraper.semantic_cache import get_semantic_cache
+from config.config import (SERPAPI_KEY, SEARCH_DELAY, SEARCH_BURST, MAX_RETRIES, RESULTS_PER_QUERY,
+                           SEARCH_CONCURRENCY, SERPAPI_TIMEOUT, SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, CACHE_DIR,
+                           SEMANTIC_CACHE_MODEL, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE)
 
 logger = logging.getLogger(__name__)
 
+SERPAPI_ENDPOINT = "https://serpapi.com/search.json"
+
+# Queries differing only in case or whitespace are searched once
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _canonical_query(query: str) -> str:
+    """Normalize a query string for duplicate detection"""
+    return _WHITESPACE_RE.sub(' ', query.strip().lower())
+
+@functools.lru_cache(maxsize=8192)
+def _extract_domain(url: str) -> str:
+    """Extract domain from URL; cached because result hosts repeat heavily"""
+    if not url:
+        return ""
+    try:
+        return urlparse(url).netloc
+    except ValueError:
+        return ""
+
 class SearchEngine:
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, cache_ttl: Optional[int] = None,
+                 use_semantic_cache: bool = True):
         if not SERPAPI_KEY:
             raise ValueError("SERPAPI_KEY not found in environment variables")
         self.api_key = SERPAPI_KEY
-        
+        # Request parameters shared by every query; only "q" varies per call
+        self._base_params = MappingProxyType({
+            "engine": "google",
+            "api_key": self.api_key,
+            "num": RESULTS_PER_QUERY,
+            "gl": "in",  # India
+            "hl": "en"   # English
+        })
+        # Pooled keep-alive connections to SerpAPI; retries are handled in search_google
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+        # One request per SEARCH_DELAY on average, shared by the sync and async paths
+        self._limiter = TokenBucket(1 / SEARCH_DELAY if SEARCH_DELAY > 0 else None, SEARCH_BURST)
+        # Processed results keyed by (canonical query, domain), least recently used first
+        self._results_cache = OrderedDict()
+        self._cache_lock = threading.Lock()  # the engine may be shared by several threads
+        # Persistent copy of the same results, so reruns skip SerpAPI until cache_ttl expires
+        self.cache_ttl = SEARCH_CACHE_TTL if cache_ttl is None else cache_ttl
+        self._disk_cache = self._open_disk_cache() if use_cache else None
+        # Paraphrased queries reuse earlier results when sentence-transformers is installed
+        self._semantic_cache = None
+        if use_cache and use_semantic_cache:
+            # Shared per path, so every engine feeds one cache that is saved once at exit
+            semantic_cache = get_semantic_cache(os.path.join(CACHE_DIR, 'semantic'), SEMANTIC_CACHE_MODEL,
+                                                SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE)
+            if semantic_cache.enabled:
+                self._semantic_cache = semantic_cache
+    
+    def _search_params(self, query: str) -> Dict:
+        """SerpAPI request parameters for a query"""
+        return {**self._base_params, "q": query}
+    
     def search_google(self, query: str, domain: str) -> List[Dict]:
         """
         Search Google using SerpAPI for a given query and domain
         """
+        cache_key = (_canonical_query(query), domain)
+        cached = self._cache_get(cache_key, query)
+        if cached is not None:
+            return cached
+        
         logger.info(f"Searching for: {query}")
         
-        search_params = {
-            "engine": "google",
-            "q": query,
-            "api_key": self.api_key,
-            "num": RESULTS_PER_QUERY,
-            "gl": "in",  # India
-            "hl": "en"   # English
-        }
+        search_params = self._search_params(query)
         
         for attempt in range(MAX_RETRIES):
             try:
-                search = GoogleSearch(search_params)
-                results = search.get_dict()
+                self._limiter.acquire()  # Rate limiting
+                response = self.http.get(SERPAPI_ENDPOINT, params=search_params, timeout=(5, SERPAPI_TIMEOUT))
+                response.raise_for_status()
+                results = response.json()
                 
                 if "organic_results" in results:
-                    processed_results = []
-                    for result in results["organic_results"]:
-                        processed_result = {
-                            "title": result.get("title", ""),
-                            "url": result.get("link", ""),
-                            "snippet": result.get("snippet", ""),
-                            "domain": self._extract_domain(result.get("link", "")),
-                            "position": result.get("position", 0),
-                            "query": query,
-                            "search_domain": domain
-                        }
-                        processed_results.append(processed_result)
-                    
-                    logger.info(f"Found {len(processed_results)} results for query: {query}")
-                    time.sleep(SEARCH_DELAY)  # Rate limiting
-                    return processed_results
+                    return self._cache_put(cache_key, self._process_results(results, query, domain), query)
+            
+            except Exception as e:
+                logger.error(f"Search attempt {attempt + 1} failed: {describe_error(e)}")
+                if attempt < MAX_RETRIES - 1 and is_retryable(e):
+                    time.sleep(backoff_delay(attempt))  # Jittered exponential backoff
+                else:
+                    logger.error(f"All search attempts failed for query: {query}")
+                    return []
+        
+        return []
+    
+    async def _search_google_async(self, session, query: str, domain: str) -> List[Dict]:
+        """Async counterpart of search_google using a shared aiohttp session"""
+        cache_key = (_canonical_query(query), domain)
+        # Cache access may read disk and embed the query, so it runs off the event loop
+        cached = await asyncio.to_thread(self._cache_get, cache_key, query)
+        if cached is not None:
+            return cached
+        
+        logger.info(f"Searching for: {query}")
+        
+        search_params = self._search_params(query)
+        
+        for attempt in range(MAX_RETRIES):
+            try:
+                await self._limiter.acquire_async()  # Rate limiting
+                async with session.get(SERPAPI_ENDPOINT, params=search_params) as response:
+                    response.raise_for_status()
+                    results = await response.json()
                 
+                if "organic_results" in results:
+                    return await asyncio.to_thread(
+                        self._cache_put, cache_key, self._process_results(results, query, domain), query
+                    )
+            
             except Exception as e:
-                logger.error(f"Search attempt {attempt + 1} failed: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                logger.error(f"Search attempt {attempt + 1} failed: {describe_error(e)}")
+                if attempt < MAX_RETRIES - 1 and is_retryable(e):
+                    await asyncio.sleep(backoff_delay(attempt))  # Jittered exponential backoff
                 else:
                     logger.error(f"All search attempts failed for query: {query}")
                     return []
         
         return []
     
-    def _extract_domain(self, url: str) -> str:
-        """Extract domain from URL"""
+    def _process_results(self, results: Dict, query: str, domain: str) -> List[Dict]:
+        """Flatten SerpAPI organic results into result dicts"""
+        processed_results = []
+        for result in results["organic_results"]:
+            processed_result = {
+                "title": result.get("title", ""),
+                "url": result.get("link", ""),
+                "snippet": result.get("snippet", ""),
+                "domain": _extract_domain(result.get("link", "")),
+                "position": result.get("position", 0),
+                "query": query,
+                "search_domain": domain
+            }
+            processed_results.append(processed_result)
+        
+        logger.info(f"Found {len(processed_results)} results for query: {query}")
+        return processed_results
+    
+    def _cache_get(self, key: Tuple, query: str) -> Optional[List[Dict]]:
+        """Return previously processed results for a query (or a paraphrase of it) from memory or disk, if any"""
+        with self._cache_lock:
+            results = self._results_cache.get(key)
+            if results is not None:
+                self._results_cache.move_to_end(key)
+                return results
+        
+        if self._disk_cache is not None:
+            try:
+                results = self._disk_cache.get(self._disk_key(key))
+            except Exception as e:
+                logger.warning(f"Could not read search results cache: {e}")
+        if results is None and self._semantic_cache is not None:
+            # Entries older than cache_ttl are skipped, so paraphrase hits never outlive the disk cache
+            results = self._semantic_cache.lookup(query, key[1], max_age=self.cache_ttl)
+            if results is not None:
+                # Attribute the reused results to the query that asked for them
+                results = [{**result, "query": query} for result in results]
+        if results is not None:
+            self._remember(key, results)
+        return results
+    
+    def _cache_put(self, key: Tuple, results: List[Dict], query: str) -> List[Dict]:
+        """Remember processed results for a query in memory and on disk; returns them"""
+        self._remember(key, results)
+        if self._semantic_cache is not None:
+            self._semantic_cache.add(query, key[1], results)
+        if self._disk_cache is not None:
+            try:
+                self._disk_cache.set(self._disk_key(key), results, expire=self.cache_ttl)
+            except Exception as e:
+                logger.warning(f"Could not persist search results: {e}")
+        return results
+    
+    def _remember(self, key: Tuple, results: List[Dict]):
+        """Insert into the in-memory LRU, evicting the least recently used"""
+        with self._cache_lock:
+            self._results_cache[key] = results
+            self._results_cache.move_to_end(key)
+            if len(self._results_cache) > SEARCH_CACHE_SIZE:
+                self._results_cache.popitem(last=False)
+    
+    def _disk_key(self, key: Tuple) -> str:
+        """Persistent cache key covering every parameter that shapes the results"""
+        canon, domain = key
+        params = {"q": canon, "domain": domain, "gl": "in", "hl": "en", "num": RESULTS_PER_QUERY}
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _open_disk_cache(self):
+        """Open the persistent results cache, or None if diskcache is missing"""
+        if not DISKCACHE_AVAILABLE:
+            logger.info("diskcache not installed, search results are cached in memory only")
+            return None
         try:
-            from urllib.parse import urlparse
-            return urlparse(url).netloc
-        except:
-            return ""
+            return diskcache.Cache(os.path.join(CACHE_DIR, 'serpapi_results'), size_limit=2 ** 30)
+        except Exception as e:
+            logger.warning(f"Could not open search results cache, using in-memory cache only: {e}")
+            return None
+    
+    def batch_search(self, queries: List[str], domain: str) -> List[List[Dict]]:
+        """Run several queries for a domain, returning each query's results in order"""
+        # Group positions by canonical query so each distinct query costs one request
+        groups = {}
+        for i, query in enumerate(queries):
+            groups.setdefault(_canonical_query(query), []).append(i)
+        unique = [queries[positions[0]] for positions in groups.values()]
+        
+        if AIOHTTP_AVAILABLE:
+            unique_results = asyncio.run(self.batch_search_async(unique, domain))
+        else:
+            unique_results = [self.search_google(query, domain) for query in unique]
+        
+        # Scatter each result list back to every duplicate's position
+        results = [None] * len(queries)
+        for positions, query_results in zip(groups.values(), unique_results):
+            for i in positions:
+                results[i] = query_results
+        if len(unique) < len(queries):
+            logger.info(f"Deduplicated {len(queries)} queries to {len(unique)} searches")
+        return results
+    
+    async def batch_search_async(self, queries: List[str], domain: str,
+                                 concurrency: int = SEARCH_CONCURRENCY) -> List[List[Dict]]:
+        """Run queries concurrently, bounded by `concurrency` in-flight requests and the rate limiter"""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(session, query: str) -> List[Dict]:
+            async with semaphore:
+                return await self._search_google_async(session, query, domain)
+        
+        # The connector is bound to the running loop, so each batch opens its own pooled session
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=10, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector,
+                                         timeout=aiohttp.ClientTimeout(total=SERPAPI_TIMEOUT)) as session:
+            return await asyncio.gather(*(bounded(session, query) for query in queries))
     
     def search_domain_queries(self, domain: str, prompts: List[str], domain_keywords: List[str]) -> List[Dict]:
         """
         Generate and execute all search queries for a specific domain
         """
-        all_results = []
+        # Combine domain keywords with each prompt
+        queries = [f"{keyword} {prompt}" for prompt in prompts for keyword in domain_keywords]
         
-        for prompt in prompts:
-            # Combine domain keywords with prompt
-            for keyword in domain_keywords:
-                query = f"{keyword} {prompt}"
-                results = self.search_google(query, domain)
-                all_results.extend(results)
+        all_results = []
+        for results in self.batch_search(queries, domain):
+            all_results.extend(results)
         
         logger.info(f"Total results collected for {domain}: {len(all_results)}")
         return all_results
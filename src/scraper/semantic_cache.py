@@ -0,0 +1,172 @@
+"""
+Semantic cache for search results
+Returns stored results for queries that are paraphrases of an earlier query, using sentence embeddings
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Embedding-based lookup needs sentence-transformers (which brings numpy); the cache is inert without it
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+    np = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# Embeddings barely separate queries that differ only in a place name or a number, so a hit also
+# needs these tokens to agree exactly: Indian states, union territories and major cities
+_PLACE_WORDS = frozenset("""
+    india andhra arunachal assam bihar chhattisgarh goa gujarat haryana himachal jharkhand karnataka
+    kerala madhya maharashtra manipur meghalaya mizoram nagaland odisha orissa punjab rajasthan sikkim
+    tamil nadu telangana tripura uttar uttarakhand bengal andaman nicobar chandigarh dadra nagar haveli
+    daman diu delhi jammu kashmir ladakh lakshadweep puducherry pondicherry mumbai bombay kolkata
+    calcutta chennai madras bengaluru bangalore hyderabad ahmedabad pune surat jaipur lucknow kanpur
+    nagpur indore thane bhopal visakhapatnam vizag patna vadodara baroda ghaziabad ludhiana agra nashik
+    faridabad meerut rajkot varanasi srinagar aurangabad amritsar ranchi coimbatore jabalpur gwalior
+    vijayawada jodhpur madurai raipur kota guwahati mysuru mysore noida gurugram gurgaon tiruppur
+    bhubaneswar cuttack kochi cochin thiruvananthapuram trivandrum dehradun jamshedpur moradabad
+    aligarh jalandhar salem warangal bhiwandi panipat sonipat morbi
+""".split())
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def _guard_tokens(query: str) -> frozenset:
+    """Place names and numbers in a query, which a paraphrase must repeat exactly"""
+    return frozenset(
+        token for token in _TOKEN_RE.findall(query.lower())
+        if token.isdigit() or token in _PLACE_WORDS
+    )
+
+# One cache per path, so engines sharing a path share entries and save once at exit
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+def get_semantic_cache(path: str, model_name: str = 'all-MiniLM-L6-v2', threshold: float = 0.92,
+                       max_entries: int = 10000) -> 'SemanticCache':
+    """Return the process-wide cache stored at path, creating it and registering its save on first use"""
+    with _shared_lock:
+        cache = _shared_caches.get(path)
+        if cache is None:
+            cache = SemanticCache(path, model_name, threshold, max_entries)
+            _shared_caches[path] = cache
+            if cache.enabled:
+                atexit.register(cache.save)
+        return cache
+
+class SemanticCache:
+    """Nearest-neighbour cache of search results keyed by normalized query embeddings"""
+    
+    def __init__(self, path: str, model_name: str = 'all-MiniLM-L6-v2', threshold: float = 0.92,
+                 max_entries: int = 10000):
+        self.path = path
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.enabled = SEMANTIC_CACHE_AVAILABLE
+        self._model = None  # loaded on first use, it takes seconds
+        self._model_lock = threading.Lock()
+        self._vectors = None  # (capacity, dim) float32 buffer of unit-length embeddings; rows [:_size] are live
+        self._size = 0
+        self._entries = []  # parallel list of {"domain", "query", "results", "time"}, oldest first
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._load()
+    
+    def lookup(self, query: str, domain: str, max_age: Optional[float] = None) -> Optional[List[Dict]]:
+        """Results of the most similar cached query for the same domain, if similar enough and not older than max_age seconds"""
+        if not self.enabled or not self._size:
+            return None
+        vector = self._embed(query)
+        oldest = time.time() - max_age if max_age is not None else None
+        guard = _guard_tokens(query)
+        with self._lock:
+            scores = self._vectors[:self._size] @ vector
+            # Only fresh entries for the same domain, places and numbers are candidates
+            for i in np.argsort(-scores):
+                if scores[i] <= self.threshold:
+                    return None
+                entry = self._entries[i]
+                if (entry["domain"] == domain and (oldest is None or entry.get("time", 0) >= oldest)
+                        and _guard_tokens(entry["query"]) == guard):
+                    logger.info(f"Semantic cache hit ({scores[i]:.3f}): '{query}' ~ '{entry['query']}'")
+                    return entry["results"]
+        return None
+    
+    def add(self, query: str, domain: str, results: List[Dict]):
+        """Store results under the query's embedding, evicting the oldest entries beyond max_entries"""
+        if not self.enabled:
+            return
+        vector = self._embed(query)
+        with self._lock:
+            self._append(vector, {"domain": domain, "query": query, "results": results, "time": time.time()})
+            self._dirty = True
+    
+    def save(self):
+        """Write the embeddings and payloads to disk if anything changed"""
+        if not self.enabled or not self._dirty:
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with self._lock:
+                np.save(os.path.join(self.path, 'vectors.npy'), self._vectors[:self._size])
+                with open(os.path.join(self.path, 'entries.json'), 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                self._dirty = False
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache: {e}")
+    
+    def _append(self, vector, entry: Dict):
+        """Add one row, doubling the buffer when full; caller holds _lock"""
+        if self._vectors is None:
+            self._vectors = np.empty((16, vector.shape[0]), dtype=np.float32)
+        elif self._size == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+        self._vectors[self._size] = vector
+        self._size += 1
+        self._entries.append(entry)
+        
+        # Evict a quarter at a time so the shift is amortized over many inserts
+        if self._size > self.max_entries:
+            drop = self._size - self.max_entries + self.max_entries // 4
+            self._vectors[:self._size - drop] = self._vectors[drop:self._size]
+            self._size -= drop
+            del self._entries[:drop]
+    
+    def _load(self):
+        """Load a previously saved cache, if any"""
+        vectors_path = os.path.join(self.path, 'vectors.npy')
+        entries_path = os.path.join(self.path, 'entries.json')
+        if not (os.path.exists(vectors_path) and os.path.exists(entries_path)):
+            return
+        try:
+            vectors = np.load(vectors_path)
+            with open(entries_path, encoding='utf-8') as f:
+                entries = json.load(f)
+            # Keep only the newest max_entries
+            keep = min(len(entries), len(vectors), self.max_entries)
+            if not keep:
+                return
+            self._vectors = np.array(vectors[len(vectors) - keep:], dtype=np.float32)
+            self._entries = entries[len(entries) - keep:]
+            self._size = keep
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache, starting empty: {e}")
+            self._vectors, self._entries, self._size = None, [], 0
+    
+    def _embed(self, query: str):
+        """Unit-length embedding of a query, so a dot product is the cosine similarity"""
+        with self._model_lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(query, normalize_embeddings=True).astype(np.float32)
@@ -1,19 +1,70 @@
+import asyncio
+import random
 import requests
 import time
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 import validators
-from fake_useragent import UserAgent
+from requests.adapters import HTTPAdapter
+
+# Bulk URL probes run concurrently over aiohttp when available
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+from config.config import CRAWL_CONCURRENCY
 
 logger = logging.getLogger(__name__)
 
+# Browser User-Agents rotated between crawler sessions; a fixed list needs no network fetch at startup
+_UA_POOL: Tuple[str, ...] = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36 Edg/123.0.0.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:124.0) Gecko/20100101 Firefox/124.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:124.0) Gecko/20100101 Firefox/124.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Safari/605.1.15',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (Linux; Android 13; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Mobile Safari/537.36',
+)
+
+# File type lookups for _determine_file_type, in precedence order
+_CONTENT_TYPE_TABLE = (
+    ('pdf', 'PDF'),
+    ('excel', 'Excel'),
+    ('spreadsheet', 'Excel'),
+    ('csv', 'CSV'),
+    ('json', 'JSON/API'),
+    ('xml', 'XML'),
+    ('html', 'Web Page'),
+)
+_EXT_TYPES = {'.pdf': 'PDF', '.xlsx': 'Excel', '.xls': 'Excel', '.csv': 'CSV', '.json': 'JSON/API', '.xml': 'XML'}
+
 class WebCrawler:
     def __init__(self):
-        self.ua = UserAgent()
+        # Keep-alive pools for up to 100 hosts, so revisiting a host skips the TCP/TLS handshake
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
-            'User-Agent': self.ua.random,
+            'User-Agent': random.choice(_UA_POOL),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Accept-Encoding': 'gzip, deflate',
@@ -30,24 +81,7 @@ class WebCrawler:
         try:
             # Make HEAD request first to get headers
             response = self.session.head(url, timeout=10, allow_redirects=True)
-            
-            page_info = {
-                "url": url,
-                "status_code": response.status_code,
-                "content_type": response.headers.get('content-type', ''),
-                "content_length": response.headers.get('content-length', 0),
-                "server": response.headers.get('server', ''),
-                "last_modified": response.headers.get('last-modified', ''),
-                "accessible": response.status_code == 200
-            }
-            
-            # Determine file type
-            page_info["file_type"] = self._determine_file_type(
-                page_info["content_type"], 
-                url
-            )
-            
-            return page_info
+            return self._build_page_info(url, response.status_code, response.headers)
             
         except requests.RequestException as e:
             logger.error(f"Error accessing {url}: {str(e)}")
@@ -58,34 +92,99 @@ class WebCrawler:
                 "file_type": "unknown"
             }
     
+    def get_page_info_many_sync(self, urls: List[str]) -> List[Dict]:
+        """
+        Get page info for many URLs, probing them concurrently when aiohttp is available
+        """
+        if not AIOHTTP_AVAILABLE:
+            return [self.get_page_info(url) for url in urls]
+        return asyncio.run(self.get_page_info_many(urls))
+    
+    async def get_page_info_many(self, urls: List[str], concurrency: int = CRAWL_CONCURRENCY) -> List[Dict]:
+        """
+        Async bulk get_page_info over one pooled session, bounded by `concurrency` in-flight probes
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(session, url: str) -> Dict:
+            async with semaphore:
+                return await self._probe(session, url)
+        
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=10)
+        async with aiohttp.ClientSession(connector=connector, headers=dict(self.session.headers),
+                                         timeout=aiohttp.ClientTimeout(total=10)) as session:
+            return await asyncio.gather(*(bounded(session, url) for url in urls))
+    
+    async def _probe(self, session, url: str) -> Dict:
+        """
+        Async counterpart of get_page_info on a shared aiohttp session
+        """
+        if not validators.url(url):
+            return {"error": "Invalid URL"}
+        
+        # Any failure is reported for this URL alone; raising would abort the whole gather
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                return self._build_page_info(url, response.status, response.headers)
+        except Exception as e:
+            logger.error(f"Error accessing {url}: {str(e)}")
+            return {
+                "url": url,
+                "error": str(e) or type(e).__name__,
+                "accessible": False,
+                "file_type": "unknown"
+            }
+    
+    def _build_page_info(self, url: str, status_code: int, headers) -> Dict:
+        """
+        Page info dict from a HEAD response's status and headers
+        """
+        page_info = {
+            "url": url,
+            "status_code": status_code,
+            "content_type": headers.get('content-type', ''),
+            "content_length": headers.get('content-length', 0),
+            "server": headers.get('server', ''),
+            "last_modified": headers.get('last-modified', ''),
+            "accessible": status_code == 200
+        }
+        
+        # Determine file type
+        page_info["file_type"] = self._determine_file_type(
+            page_info["content_type"], 
+            url
+        )
+        
+        return page_info
+    
     def get_page_content(self, url: str, max_size: int = 1024*1024) -> Tuple[str, Dict]:
         """
         Get page content with size limits for analysis
         """
         try:
-            response = self.session.get(url, timeout=15, stream=True)
-            response.raise_for_status()
-            
-            # Check content size
-            content_length = response.headers.get('content-length')
-            if content_length and int(content_length) > max_size:
-                return "", {"error": "Content too large"}
-            
-            # Read content with size limit
-            content = ""
-            size = 0
-            for chunk in response.iter_content(chunk_size=8192, decode_unicode=True):
-                if chunk:
-                    content += chunk
-                    size += len(chunk.encode('utf-8'))
-                    if size > max_size:
+            with self.session.get(url, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                
+                # Check content size
+                content_length = response.headers.get('content-length')
+                if content_length and int(content_length) > max_size:
+                    return "", {"error": "Content too large"}
+                
+                # Read raw bytes with size limit, decoding once at the end
+                buf = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    buf.extend(chunk)
+                    if len(buf) > max_size:
+                        del buf[max_size:]
                         break
-            
-            return content, {
-                "size": size,
-                "encoding": response.encoding,
-                "content_type": response.headers.get('content-type', '')
-            }
+                
+                content = buf.decode(response.encoding or 'utf-8', errors='replace')
+                
+                return content, {
+                    "size": len(buf),
+                    "encoding": response.encoding,
+                    "content_type": response.headers.get('content-type', '')
+                }
             
         except Exception as e:
             logger.error(f"Error getting content from {url}: {str(e)}")
@@ -97,19 +196,10 @@ class WebCrawler:
         """
         content_type = content_type.lower()
         url_lower = url.lower()
+        ext_type = _EXT_TYPES.get(url_lower[url_lower.rfind('.'):])
         
-        if 'pdf' in content_type or url_lower.endswith('.pdf'):
-            return "PDF"
-        elif 'excel' in content_type or 'spreadsheet' in content_type or \
-             url_lower.endswith(('.xlsx', '.xls')):
-            return "Excel"
-        elif 'csv' in content_type or url_lower.endswith('.csv'):
-            return "CSV"
-        elif 'json' in content_type or url_lower.endswith('.json'):
-            return "JSON/API"
-        elif 'xml' in content_type or url_lower.endswith('.xml'):
-            return "XML"
-        elif 'html' in content_type or 'text/html' in content_type:
-            return "Web Page"
-        else:
-            return "Unknown"
+        # First match wins, so a URL extension only beats content-types lower in the table
+        for needle, file_type in _CONTENT_TYPE_TABLE:
+            if file_type == ext_type or needle in content_type:
+                return file_type
+        return "Unknown"
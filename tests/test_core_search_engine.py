@@ -0,0 +1,148 @@
+"""
+Tests for the core SearchEngine's batch search and response cache over a local fake SerpAPI endpoint
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+# config.config logs to logs/application.log relative to the working directory
+os.makedirs('logs', exist_ok=True)
+
+from src.core.rate_limiter import TokenBucket
+import src.core.search_engine as core_search
+
+class FakeSerpAPI(BaseHTTPRequestHandler):
+    """Answers search.json with two organic results per query; 'status<code>' queries fail with that code"""
+    
+    lock = threading.Lock()
+    queries = []
+    
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        with self.lock:
+            self.queries.append(query)
+        if query.startswith('status'):
+            self.send_response(int(query[len('status'):]))
+            self.end_headers()
+            return
+        slug = query.replace(' ', '-')
+        body = json.dumps({"organic_results": [
+            {"title": f"{query} directory", "link": f"https://{slug}.example.com/list.pdf",
+             "snippet": "complete list of manufacturers", "position": 1},
+            {"title": f"{query} companies", "link": f"https://{slug}.example.org/companies",
+             "snippet": "database of companies", "position": 2},
+        ]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+def _query(text: str, i: int) -> dict:
+    return {"search_query": text, "query_id": f"q{i}", "query_type": "test"}
+
+class CoreSearchEngineTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSerpAPI)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}/search.json"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        FakeSerpAPI.queries = []
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        patches = [
+            mock.patch.object(core_search, 'SERPAPI_ENDPOINT', self.endpoint),
+            mock.patch.object(core_search, 'CACHE_DIR', self.cache_dir.name),
+            mock.patch('src.core.retry.SEARCH_BACKOFF_BASE', 0.01),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.engine = self._engine(use_cache=False)
+    
+    def _engine(self, **kwargs) -> core_search.SearchEngine:
+        engine = core_search.SearchEngine(api_key='test-key', **kwargs)
+        engine._limiter = TokenBucket(None)
+        return engine
+    
+    def test_batch_search_searches_variants_once_and_scatters_results(self):
+        queries = [_query('steel pipes', 1), _query('Steel  Pipes', 2), _query('copper wire', 3)]
+        results, stats = self.engine.batch_search(queries, 'Metals')
+        
+        self.assertEqual(sorted(FakeSerpAPI.queries), ['copper wire', 'steel pipes'])
+        self.assertEqual([r.query_id for r in results], ['q1', 'q2', 'q3'])
+        self.assertEqual([r.query for r in results], ['steel pipes', 'Steel  Pipes', 'copper wire'])
+        self.assertEqual(results[0].results, results[1].results)
+        self.assertEqual(stats, {"total_sources": sum(len(r.results) for r in results),
+                                 "successful_queries": 3, "error_queries": 0})
+    
+    def test_failed_query_is_reported_without_the_api_key(self):
+        results, stats = self.engine.batch_search([_query('status400', 1), _query('steel pipes', 2)], 'Metals')
+        
+        self.assertEqual(results[0].status, 'error')
+        self.assertIn('400', results[0].error_message)
+        self.assertNotIn('test-key', results[0].error_message)
+        self.assertEqual(results[1].status, 'success')
+        self.assertEqual((stats["successful_queries"], stats["error_queries"]), (1, 1))
+        self.assertEqual(FakeSerpAPI.queries.count('status400'), 1)
+    
+    def test_memory_cache_expires_after_cache_ttl(self):
+        self.engine.cache_ttl = 0.2
+        self.engine.search_query('steel pipes', 'Metals')
+        self.engine.search_query('steel pipes', 'Metals')
+        self.assertEqual(len(FakeSerpAPI.queries), 1)
+        
+        time.sleep(0.3)
+        self.engine.search_query('steel pipes', 'Metals')
+        self.assertEqual(len(FakeSerpAPI.queries), 2)
+    
+    @unittest.skipUnless(core_search.DISKCACHE_AVAILABLE, "diskcache is not installed")
+    def test_disk_cache_serves_reruns_until_cache_ttl(self):
+        self._engine(cache_ttl=0.3).search_query('steel pipes', 'Metals')
+        
+        rerun = self._engine(cache_ttl=0.3)
+        self.assertEqual(rerun.search_query('steel pipes', 'Metals').status, 'success')
+        self.assertEqual((len(FakeSerpAPI.queries), rerun.cache_hits), (1, 1))
+        
+        time.sleep(0.4)
+        self.assertEqual(rerun.search_query('steel pipes', 'Metals').status, 'success')
+        self.assertEqual(len(FakeSerpAPI.queries), 2)
+    
+    def test_batch_search_ignores_a_session_from_another_loop(self):
+        asyncio.run(self.engine.__aenter__())
+        self.addCleanup(lambda: asyncio.run(self.engine.__aexit__(None, None, None)))
+        
+        results, stats = self.engine.batch_search([_query('steel pipes', 1)], 'Metals')
+        
+        self.assertEqual(results[0].status, 'success')
+        self.assertEqual(stats["error_queries"], 0)
+    
+    def test_batch_search_without_aiohttp_searches_sequentially(self):
+        with mock.patch.object(core_search, 'AIOHTTP_AVAILABLE', False):
+            results, stats = self.engine.batch_search([_query('steel pipes', 1), _query('copper wire', 2)], 'Metals')
+        
+        self.assertEqual([r.query_id for r in results], ['q1', 'q2'])
+        self.assertEqual(stats["successful_queries"], 2)
+        self.assertEqual(FakeSerpAPI.queries, ['steel pipes', 'copper wire'])
+
+if __name__ == '__main__':
+    unittest.main()
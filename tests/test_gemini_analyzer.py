@@ -0,0 +1,206 @@
+"""
+Tests for GeminiAnalyzer's batched structured analysis with a fake Gemini model
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import unittest
+from unittest import mock
+
+# config.config logs to logs/application.log relative to the working directory
+os.makedirs('logs', exist_ok=True)
+
+import src.core.gemini_analyzer as gemini_analyzer
+from src.core.gemini_analyzer import GeminiAnalyzer
+
+_URL_RE = re.compile(r'^\s+URL: (\S+)$', re.MULTILINE)
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """Answers batch analysis prompts with one object per packed result, as GenerativeModel would"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.prompts = []
+        self.loops = set()
+        self.skip_urls = set()  # results left out of the answer
+        self.broken_urls = set()  # a prompt containing one of these gets truncated JSON
+    
+    def answer(self, prompt):
+        urls = _URL_RE.findall(prompt)
+        with self.lock:
+            self.prompts.append(urls)
+        if self.broken_urls.intersection(urls):
+            return FakeResponse('{"results": [{"index": 1, "sec')
+        return FakeResponse(json.dumps({"results": [
+            {"index": i, "sector": f"Gemini {url}", "format": "Website",
+             "action_required": "Website Crawling", "no_of_datapoints": 42}
+            for i, url in enumerate(urls, 1) if url not in self.skip_urls
+        ]}))
+    
+    def generate_content(self, prompt, generation_config=None):
+        return self.answer(prompt)
+    
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.loops.add(asyncio.get_running_loop())
+        return self.answer(prompt)
+
+def _results(*names):
+    return [{"title": f"{name} manufacturers", "link": f"https://{name}.example.com", "snippet": "list"}
+            for name in names]
+
+def _analyzer(model):
+    analyzer = GeminiAnalyzer(api_key='')
+    analyzer.enabled = True
+    analyzer.model = model
+    analyzer.response_cache = {}
+    return analyzer
+
+class BatchAnalysisTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.model = FakeModel()
+        self.analyzer = _analyzer(self.model)
+    
+    def test_packs_batch_size_results_per_prompt(self):
+        results = _results('a', 'b', 'c', 'd', 'e')
+        points = self.analyzer.analyze_search_results_batch_sync(results, 'EdTech', batch_size=2)
+        
+        self.assertEqual(sorted(len(urls) for urls in self.model.prompts), [1, 2, 2])
+        self.assertEqual([p.sector for p in points], [f"Gemini {r['link']}" for r in results])
+        self.assertEqual([p.no_of_datapoints for p in points], [42] * 5)
+    
+    def test_result_missing_from_response_falls_back_alone(self):
+        results = _results('a', 'b', 'c')
+        self.model.skip_urls.add('https://b.example.com')
+        points = self.analyzer.analyze_batch(results, 'EdTech', batch_size=3)
+        
+        self.assertEqual(points[0].sector, 'Gemini https://a.example.com')
+        self.assertEqual(points[1].additional_comment, 'Standard analysis - LLM enhancement available')
+        self.assertEqual(points[2].sector, 'Gemini https://c.example.com')
+    
+    def test_malformed_response_falls_back_and_is_not_cached(self):
+        results = _results('a', 'b')
+        self.model.broken_urls.add('https://a.example.com')
+        points = self.analyzer.analyze_search_results_batch_sync(results, 'EdTech', batch_size=2)
+        
+        self.assertTrue(all(p.additional_comment.startswith('Standard analysis') for p in points))
+        self.assertEqual(self.analyzer.response_cache, {})
+        
+        self.model.broken_urls.clear()
+        points = self.analyzer.analyze_search_results_batch_sync(results, 'EdTech', batch_size=2)
+        self.assertEqual(points[0].sector, 'Gemini https://a.example.com')
+        self.assertEqual(len(self.model.prompts), 2)
+    
+    def test_cached_and_duplicate_results_are_not_sent_again(self):
+        self.analyzer.analyze_search_results_batch_sync(_results('a', 'b'), 'EdTech', batch_size=2)
+        points = self.analyzer.analyze_search_results_batch_sync(_results('b', 'c', 'c', 'a'), 'EdTech', batch_size=2)
+        
+        self.assertEqual(self.model.prompts[1:], [['https://c.example.com']])
+        self.assertEqual([p.sector for p in points],
+                         [f"Gemini https://{name}.example.com" for name in ('b', 'c', 'c', 'a')])
+    
+    def test_cache_is_per_domain(self):
+        self.analyzer.analyze_batch(_results('a'), 'EdTech')
+        self.analyzer.analyze_batch(_results('a'), 'Shipping')
+        
+        self.assertEqual(len(self.model.prompts), 2)
+    
+    def test_sync_wrappers_share_one_event_loop_across_threads(self):
+        threads = [
+            threading.Thread(target=self.analyzer.analyze_search_results_batch_sync,
+                             args=(_results(f"t{i}"), 'EdTech'))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.analyzer.generate_smart_queries_batch_sync(['EdTech'], 5)
+        
+        self.assertEqual(len(self.model.prompts), 5)
+        self.assertEqual(len(self.model.loops), 1)
+    
+    def test_disabled_analyzer_uses_rule_based_analysis(self):
+        self.analyzer.enabled = False
+        points = self.analyzer.analyze_search_results_batch_sync(_results('a', 'b'), 'EdTech')
+        
+        self.assertEqual(self.model.prompts, [])
+        self.assertEqual(len(points), 2)
+
+class FailingModel(FakeModel):
+    """Raises the queued errors, one per call, before answering normally"""
+    
+    def __init__(self, *errors):
+        super().__init__()
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def answer(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return super().answer(prompt)
+
+class RetryAndBreakerTest(unittest.TestCase):
+    
+    def setUp(self):
+        patches = [
+            mock.patch.object(gemini_analyzer, 'GEMINI_RETRY_BASE_DELAY', 0.001),
+            mock.patch.object(gemini_analyzer, 'GEMINI_BREAKER_THRESHOLD', 3),
+            mock.patch.object(gemini_analyzer, 'GEMINI_BREAKER_COOLDOWN', 60),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_transient_errors_are_retried(self):
+        model = FailingModel(TimeoutError(), asyncio.TimeoutError())
+        points = _analyzer(model).analyze_search_results_batch_sync(_results('a'), 'EdTech')
+        
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(points[0].sector, 'Gemini https://a.example.com')
+    
+    def test_other_errors_fail_fast_to_rule_based_analysis(self):
+        model = FailingModel(ValueError('blocked prompt'))
+        points = _analyzer(model).analyze_batch(_results('a'), 'EdTech')
+        
+        self.assertEqual(model.calls, 1)
+        self.assertTrue(points[0].additional_comment.startswith('Standard analysis'))
+    
+    def test_breaker_opens_after_consecutive_failures_and_closes_after_cooldown(self):
+        model = FailingModel(*[ValueError('unavailable')] * 3)
+        analyzer = _analyzer(model)
+        for name in ('a', 'b', 'c'):
+            analyzer.analyze_batch(_results(name), 'EdTech')
+        
+        self.assertFalse(analyzer._llm_ready())
+        analyzer.analyze_batch(_results('d'), 'EdTech')
+        analyzer.generate_smart_queries('EdTech', 5)
+        self.assertEqual(model.calls, 3)
+        
+        analyzer._circuit_open_until = time.monotonic()
+        points = analyzer.analyze_batch(_results('d'), 'EdTech')
+        self.assertEqual(points[0].sector, 'Gemini https://d.example.com')
+        self.assertEqual(model.calls, 4)
+    
+    def test_success_resets_the_failure_count(self):
+        model = FailingModel(ValueError('x'), ValueError('x'))
+        analyzer = _analyzer(model)
+        for name in ('a', 'b', 'c'):
+            analyzer.analyze_batch(_results(name), 'EdTech')
+        model.errors = [ValueError('x'), ValueError('x')]
+        for name in ('d', 'e'):
+            analyzer.analyze_batch(_results(name), 'EdTech')
+        
+        self.assertTrue(analyzer._llm_ready())
+
+if __name__ == '__main__':
+    unittest.main()
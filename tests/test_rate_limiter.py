@@ -0,0 +1,98 @@
+"""
+Tests for the shared TokenBucket rate limiter
+"""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import src.core.rate_limiter as rate_limiter
+from src.core.rate_limiter import TokenBucket
+
+class FakeClock:
+    """Stands in for the time module: monotonic() only moves when sleep() or advance() is called"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+class TokenBucketTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        patch = mock.patch.object(rate_limiter, 'time', self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+    
+    def test_burst_then_queued_at_rate(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        
+        self.assertEqual([bucket._reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        # Later callers reserve future tokens, so their waits stack up in arrival order
+        self.assertEqual([bucket._reserve() for _ in range(3)], [0.5, 1.0, 1.5])
+    
+    def test_refills_at_rate(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        for _ in range(3):
+            bucket._reserve()
+        
+        self.clock.advance(1.0)
+        self.assertEqual([bucket._reserve() for _ in range(3)], [0.0, 0.0, 0.5])
+    
+    def test_idle_refill_is_capped_at_capacity(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        self.clock.advance(60)
+        
+        self.assertEqual([bucket._reserve() for _ in range(4)], [0.0, 0.0, 0.0, 0.5])
+    
+    def test_acquire_sleeps_for_the_reserved_delay(self):
+        bucket = TokenBucket(rate=4, capacity=1)
+        for _ in range(3):
+            bucket.acquire()
+        
+        self.assertEqual(self.clock.sleeps, [0.25, 0.25])
+    
+    def test_no_rate_disables_limiting(self):
+        for rate in (None, 0):
+            bucket = TokenBucket(rate)
+            self.assertEqual([bucket._reserve() for _ in range(10)], [0.0] * 10)
+
+class TokenBucketAsyncTest(unittest.TestCase):
+    
+    def test_acquire_async_waits_without_blocking_the_loop(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        ticks = []
+        
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+        
+        async def run():
+            task = asyncio.ensure_future(ticker())
+            start = time.monotonic()
+            for _ in range(4):
+                await bucket.acquire_async()
+            elapsed = time.monotonic() - start
+            task.cancel()
+            return elapsed
+        
+        elapsed = asyncio.run(run())
+        
+        # Two burst tokens, then two more at 20/s
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertGreater(len(ticks), 3)
+
+if __name__ == '__main__':
+    unittest.main()
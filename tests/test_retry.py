@@ -0,0 +1,102 @@
+"""
+Tests for the retry policy shared by the search engines
+"""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+import requests
+
+# config.config logs to logs/application.log relative to the working directory
+os.makedirs('logs', exist_ok=True)
+
+import src.core.retry as retry
+from src.core.retry import is_retryable, backoff_delay, describe_error
+
+def _http_error(status: int, reason: str = 'Reason') -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.url = 'https://serpapi.com/search.json?q=steel&api_key=SECRET'
+    return requests.exceptions.HTTPError(f"{status} Error: {reason} for url: {response.url}", response=response)
+
+def _aiohttp_error(status: int):
+    return retry.aiohttp.ClientResponseError(mock.Mock(real_url='https://serpapi.com/search.json?api_key=SECRET'),
+                                             (), status=status, message='Reason')
+
+class IsRetryableTest(unittest.TestCase):
+    
+    def test_rate_limit_and_server_errors_are_retried(self):
+        for status in (429, 500, 502, 503):
+            self.assertTrue(is_retryable(_http_error(status)), status)
+    
+    def test_client_errors_are_not_retried(self):
+        for status in (400, 401, 403, 404):
+            self.assertFalse(is_retryable(_http_error(status)), status)
+    
+    def test_network_failures_are_retried(self):
+        for error in (requests.exceptions.Timeout(), requests.exceptions.ConnectionError(),
+                      asyncio.TimeoutError(), TimeoutError(), ConnectionResetError()):
+            self.assertTrue(is_retryable(error), error)
+    
+    def test_other_errors_are_not_retried(self):
+        for error in (ValueError('bad json'), KeyError('organic_results'), requests.exceptions.HTTPError('no response')):
+            self.assertFalse(is_retryable(error), error)
+    
+    @unittest.skipUnless(retry.AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_aiohttp_errors_are_judged_like_requests_errors(self):
+        self.assertTrue(is_retryable(_aiohttp_error(503)))
+        self.assertFalse(is_retryable(_aiohttp_error(404)))
+        self.assertTrue(is_retryable(retry.aiohttp.ServerDisconnectedError()))
+
+class BackoffDelayTest(unittest.TestCase):
+    
+    def setUp(self):
+        patches = [
+            mock.patch.object(retry, 'SEARCH_BACKOFF_BASE', 1.0),
+            mock.patch.object(retry, 'SEARCH_BACKOFF_MAX', 30),
+            mock.patch.object(retry, 'SEARCH_BACKOFF_JITTER', 0.5),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_doubles_per_attempt_without_jitter(self):
+        with mock.patch.object(retry.random, 'random', return_value=0.0):
+            self.assertEqual([backoff_delay(attempt) for attempt in range(4)], [1.0, 2.0, 4.0, 8.0])
+    
+    def test_jitter_adds_up_to_the_configured_fraction(self):
+        with mock.patch.object(retry.random, 'random', return_value=1.0):
+            self.assertEqual(backoff_delay(1), 3.0)
+        for _ in range(100):
+            self.assertTrue(2.0 <= backoff_delay(1) <= 3.0)
+    
+    def test_capped_at_max(self):
+        self.assertEqual(backoff_delay(10), 30)
+
+class DescribeErrorTest(unittest.TestCase):
+    
+    def test_http_errors_report_status_and_reason_only(self):
+        self.assertEqual(describe_error(_http_error(401, 'Unauthorized')), 'HTTP 401 Unauthorized')
+    
+    @unittest.skipUnless(retry.AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_aiohttp_errors_report_status_and_message_only(self):
+        self.assertEqual(describe_error(_aiohttp_error(503)), 'HTTP 503 Reason')
+    
+    def test_api_key_is_masked_in_other_errors(self):
+        error = requests.exceptions.ConnectionError(
+            "Max retries exceeded with url: /search.json?q=steel&api_key=SECRET&num=10"
+        )
+        
+        description = describe_error(error)
+        
+        self.assertNotIn('SECRET', description)
+        self.assertIn('api_key=***&num=10', description)
+    
+    def test_empty_message_falls_back_to_the_type_name(self):
+        self.assertEqual(describe_error(asyncio.TimeoutError()), 'TimeoutError')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Tests for the scraper SearchEngine's batch search over a local fake SerpAPI endpoint
+"""
+
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+# config.config logs to logs/application.log relative to the working directory
+os.makedirs('logs', exist_ok=True)
+
+from src.core.rate_limiter import TokenBucket
+import src.scraper.search_engine as scraper_search
+
+class FakeSerpAPI(BaseHTTPRequestHandler):
+    """Answers search.json with one organic result per query; 'status<code>' queries fail with that code"""
+    
+    lock = threading.Lock()
+    queries = []
+    in_flight = 0
+    max_in_flight = 0
+    
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        cls = type(self)
+        with cls.lock:
+            cls.queries.append(query)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(0.05)
+            if query.startswith('status'):
+                self.send_response(int(query[len('status'):]))
+                self.end_headers()
+                return
+            body = json.dumps({"organic_results": [
+                {"title": query, "link": f"https://{query.replace(' ', '-')}.example.com/list", "snippet": "s", "position": 1}
+            ]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+    
+    def log_message(self, *args):
+        pass
+
+class ScraperBatchSearchTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSerpAPI)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}/search.json"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        FakeSerpAPI.queries = []
+        FakeSerpAPI.max_in_flight = 0
+        patches = [
+            mock.patch.object(scraper_search, 'SERPAPI_KEY', 'test-key'),
+            mock.patch.object(scraper_search, 'SERPAPI_ENDPOINT', self.endpoint),
+            mock.patch('src.core.retry.SEARCH_BACKOFF_BASE', 0.01),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.engine = scraper_search.SearchEngine(use_cache=False)
+        self.engine._limiter = TokenBucket(None)
+    
+    def test_batch_search_returns_results_in_query_order(self):
+        results = self.engine.batch_search(['steel pipes', 'copper wire', 'cotton yarn'], 'Test')
+        
+        self.assertEqual([r[0]['title'] for r in results], ['steel pipes', 'copper wire', 'cotton yarn'])
+        self.assertEqual(results[1][0]['domain'], 'copper-wire.example.com')
+        self.assertEqual(results[2][0]['search_domain'], 'Test')
+    
+    def test_batch_search_searches_case_and_whitespace_variants_once(self):
+        results = self.engine.batch_search(['steel pipes', 'Steel  Pipes', 'copper wire'], 'Test')
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(sorted(FakeSerpAPI.queries), ['copper wire', 'steel pipes'])
+    
+    def test_batch_search_async_bounds_in_flight_requests(self):
+        queries = [f"query {i}" for i in range(8)]
+        results = scraper_search.asyncio.run(self.engine.batch_search_async(queries, 'Test', concurrency=2))
+        
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(results))
+        self.assertLessEqual(FakeSerpAPI.max_in_flight, 2)
+    
+    def test_client_errors_are_not_retried(self):
+        results = self.engine.batch_search(['status400'], 'Test')
+        
+        self.assertEqual(results, [[]])
+        self.assertEqual(FakeSerpAPI.queries, ['status400'])
+    
+    def test_server_errors_are_retried(self):
+        results = self.engine.batch_search(['status503'], 'Test')
+        
+        self.assertEqual(results, [[]])
+        self.assertEqual(len(FakeSerpAPI.queries), scraper_search.MAX_RETRIES)
+    
+    def test_paraphrase_hit_is_attributed_to_the_new_query(self):
+        cached = [{"title": "t", "url": "https://a.example.com", "query": "steel pipe makers"}]
+        self.engine._semantic_cache = mock.Mock(**{'lookup.return_value': cached})
+        
+        [results] = self.engine.batch_search(['steel pipe manufacturers'], 'Test')
+        
+        self.assertEqual(results[0]["query"], 'steel pipe manufacturers')
+        self.assertEqual(cached[0]["query"], 'steel pipe makers')
+        self.assertEqual(FakeSerpAPI.queries, [])
+    
+    def test_batch_search_without_aiohttp_searches_sequentially(self):
+        with mock.patch.object(scraper_search, 'AIOHTTP_AVAILABLE', False):
+            results = self.engine.batch_search(['steel pipes', 'STEEL PIPES', 'copper wire'], 'Test')
+        
+        self.assertEqual([r[0]['title'] for r in results], ['steel pipes', 'steel pipes', 'copper wire'])
+        self.assertEqual(FakeSerpAPI.queries, ['steel pipes', 'copper wire'])
+
+if __name__ == '__main__':
+    unittest.main()
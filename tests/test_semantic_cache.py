@@ -0,0 +1,89 @@
+"""
+Tests for the scraper's paraphrase cache with a fake embedding model
+"""
+
+import os
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+# config.config logs to logs/application.log relative to the working directory
+os.makedirs('logs', exist_ok=True)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import src.scraper.semantic_cache as semantic_cache
+
+class FakeModel:
+    """Bag-of-words embedding that, like MiniLM, barely weighs place names"""
+    
+    def __init__(self, model_name):
+        pass
+    
+    def encode(self, text, normalize_embeddings=False):
+        vector = numpy.zeros(64, dtype=numpy.float32)
+        for token in text.lower().split():
+            weight = 0.2 if token in semantic_cache._PLACE_WORDS else 1.0
+            vector[zlib.crc32(token.encode()) % 64] += weight
+        return vector / numpy.linalg.norm(vector) if normalize_embeddings else vector
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class SemanticCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        patches = [
+            mock.patch.object(semantic_cache, 'SEMANTIC_CACHE_AVAILABLE', True),
+            mock.patch.object(semantic_cache, 'np', numpy),
+            mock.patch.object(semantic_cache, 'SentenceTransformer', FakeModel),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = semantic_cache.SemanticCache(self.tmp.name, threshold=0.9)
+        self.results = [{"title": "t", "query": "textile manufacturers in Gujarat"}]
+        self.cache.add("textile manufacturers in Gujarat", "Textiles", self.results)
+    
+    def test_paraphrase_hits(self):
+        self.assertEqual(self.cache.lookup("Gujarat textile manufacturers in", "Textiles"), self.results)
+    
+    def test_other_place_misses_despite_similar_embedding(self):
+        query = "textile manufacturers in Maharashtra"
+        vectors = self.cache._embed(query), self.cache._embed("textile manufacturers in Gujarat")
+        
+        self.assertGreater(float(vectors[0] @ vectors[1]), self.cache.threshold)
+        self.assertIsNone(self.cache.lookup(query, "Textiles"))
+    
+    def test_other_number_misses(self):
+        self.cache.add("top 500 textile manufacturers", "Textiles", self.results)
+        
+        self.assertIsNone(self.cache.lookup("top 100 textile manufacturers", "Textiles"))
+    
+    def test_other_domain_misses(self):
+        self.assertIsNone(self.cache.lookup("textile manufacturers in Gujarat", "Chemicals"))
+    
+    def test_expired_entry_misses(self):
+        self.assertIsNone(self.cache.lookup("textile manufacturers in Gujarat", "Textiles", max_age=-1))
+    
+    def test_evicts_oldest_beyond_max_entries(self):
+        cache = semantic_cache.SemanticCache(self.tmp.name, threshold=0.9, max_entries=8)
+        for i in range(9):
+            cache.add(f"query number {i}", "Textiles", [])
+        
+        self.assertLessEqual(cache._size, 8)
+        self.assertEqual(len(cache._entries), cache._size)
+        self.assertEqual(cache._entries[-1]["query"], "query number 8")
+    
+    def test_save_and_reload(self):
+        self.cache.save()
+        reloaded = semantic_cache.SemanticCache(self.tmp.name, threshold=0.9)
+        
+        self.assertEqual(reloaded.lookup("textile manufacturers in Gujarat", "Textiles"), self.results)
+
+if __name__ == '__main__':
+    unittest.main()
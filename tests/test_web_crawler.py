@@ -0,0 +1,133 @@
+"""
+Tests for WebCrawler's bulk HEAD probes against a local HTTP server
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# config.config logs to logs/application.log relative to the working directory
+os.makedirs('logs', exist_ok=True)
+
+import src.scraper.web_crawler as web_crawler
+
+class FakeSite(BaseHTTPRequestHandler):
+    """Serves HEAD for /report.pdf and /page.html; anything else is a 404"""
+    
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    
+    def do_HEAD(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(0.05)
+            content_type = {'/report.pdf': 'application/pdf', '/page.html': 'text/html'}.get(self.path.split('?')[0])
+            self.send_response(200 if content_type else 404)
+            self.send_header('Content-Type', content_type or 'text/plain')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+    
+    def log_message(self, *args):
+        pass
+
+def _closed_port() -> int:
+    """A local port with nothing listening on it"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class GetPageInfoManyTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSite)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        FakeSite.max_in_flight = 0
+        self.crawler = web_crawler.WebCrawler()
+    
+    def test_results_follow_input_order(self):
+        urls = [
+            f"{self.base}/report.pdf",
+            "not a url",
+            f"{self.base}/missing",
+            f"http://127.0.0.1:{_closed_port()}/page.html",
+            f"{self.base}/page.html",
+        ]
+        pdf, invalid, missing, unreachable, page = self.crawler.get_page_info_many_sync(urls)
+        
+        self.assertEqual((pdf['status_code'], pdf['file_type'], pdf['accessible']), (200, 'PDF', True))
+        self.assertEqual(invalid, {"error": "Invalid URL"})
+        self.assertEqual((missing['status_code'], missing['accessible']), (404, False))
+        self.assertFalse(unreachable['accessible'])
+        self.assertIn('error', unreachable)
+        self.assertEqual(page['file_type'], 'Web Page')
+    
+    def test_matches_sequential_get_page_info(self):
+        url = f"{self.base}/report.pdf"
+        [bulk] = self.crawler.get_page_info_many_sync([url])
+        
+        self.assertEqual(bulk, self.crawler.get_page_info(url))
+    
+    def test_bounds_in_flight_probes(self):
+        urls = [f"{self.base}/page.html?n={i}" for i in range(9)]
+        results = asyncio.run(self.crawler.get_page_info_many(urls, concurrency=3))
+        
+        self.assertTrue(all(info['accessible'] for info in results))
+        self.assertLessEqual(FakeSite.max_in_flight, 3)
+    
+    def test_malformed_url_does_not_abort_the_batch(self):
+        # validators lets some URLs through that aiohttp then refuses to request
+        urls = [f"{self.base}/report.pdf", "http://[bad/", f"{self.base}/page.html"]
+        with mock.patch.object(web_crawler.validators, 'url', return_value=True):
+            pdf, malformed, page = self.crawler.get_page_info_many_sync(urls)
+        
+        self.assertEqual(pdf['file_type'], 'PDF')
+        self.assertEqual((malformed['url'], malformed['accessible']), ("http://[bad/", False))
+        self.assertEqual(page['file_type'], 'Web Page')
+    
+    def test_unexpected_probe_error_does_not_abort_the_batch(self):
+        build_page_info = self.crawler._build_page_info
+        
+        def failing_build(url, status_code, headers):
+            if url.endswith('/report.pdf'):
+                raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+            return build_page_info(url, status_code, headers)
+        
+        urls = [f"{self.base}/report.pdf", f"{self.base}/page.html"]
+        with mock.patch.object(self.crawler, '_build_page_info', side_effect=failing_build):
+            failed, page = self.crawler.get_page_info_many_sync(urls)
+        
+        self.assertFalse(failed['accessible'])
+        self.assertIn('invalid start byte', failed['error'])
+        self.assertEqual(page['file_type'], 'Web Page')
+    
+    def test_without_aiohttp_probes_sequentially(self):
+        urls = [f"{self.base}/report.pdf", "not a url"]
+        with mock.patch.object(web_crawler, 'AIOHTTP_AVAILABLE', False):
+            results = self.crawler.get_page_info_many_sync(urls)
+        
+        self.assertEqual(results[0]['file_type'], 'PDF')
+        self.assertEqual(results[1], {"error": "Invalid URL"})
+
+if __name__ == '__main__':
+    unittest.main()